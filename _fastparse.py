@@ -0,0 +1,218 @@
+"""
+Parsing and scanning helpers used on the editor's hot paths.
+
+This is plain Python so the editor runs anywhere, but it is written so that
+Cython can compile it unchanged::
+
+  python setup.py build_ext --inplace
+
+The build drops a compiled ``_fastparse`` extension next to this file and
+Python's import system picks the extension over the source module, so no
+import changes are needed on either side.
+"""
+
+import ast
+import re
+from typing import Iterable, List, Tuple, Union
+
+
+_NUMBER_START = frozenset("+-.0123456789")
+_ACTION_ROW_RE = re.compile(r"\s*(\w+)\s*(=|\+=|-=|\*=|/=|//=|%=|\*\*=)\s*(.+)\s*")
+# '__' 뒤에 이름과 닫힘 '__'가 오는 자리. 여는 '__'만 소비하고 나머지는 전방 탐색으로 보아
+# 정의되지 않은 이름의 닫힘 '__'가 다음 토큰의 시작이 될 수 있게 한다.
+_VAR_TOKEN_RE = re.compile(r"__(?=([A-Za-z0-9]+(?:_[A-Za-z0-9]+)*)__)")
+_TRUE_RE = re.compile(r"\btrue\b", re.IGNORECASE)
+_FALSE_RE = re.compile(r"\bfalse\b", re.IGNORECASE)
+
+
+def parse_action_rows(expr: str) -> List[Tuple[str, str, str]]:
+    """Split ``"x += 1; y = 2"`` into ``(var, op, value)`` rows."""
+    acts: List[Tuple[str, str, str]] = []
+    if not expr:
+        return acts
+    parts = [p.strip() for p in expr.split(";") if p.strip()]
+    for part in parts:
+        m = _ACTION_ROW_RE.match(part)
+        if m:
+            acts.append((m.group(1), m.group(2), m.group(3)))
+    return acts
+
+
+def coerce_value(val_text: str) -> Union[int, float, bool, str]:
+    """Convert an initial-value entry into ``bool``/``int``/``float``/``str``.
+
+    Quoted text goes through ``ast.literal_eval`` and propagates its errors;
+    anything that is not a number is kept as a plain string.
+    """
+    lowered = val_text.lower()
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+    if (val_text.startswith('"') and val_text.endswith('"')) or (
+        val_text.startswith("'") and val_text.endswith("'")
+    ):
+        return ast.literal_eval(val_text)
+    # 숫자로 시작하지 않으면 int()/float() 예외를 거치지 않고 바로 문자열로 둔다.
+    if val_text[:1] not in _NUMBER_START:
+        # Allow plain strings without quotes
+        return val_text
+    try:
+        return int(val_text)
+    except ValueError:
+        try:
+            return float(val_text)
+        except ValueError:
+            return val_text
+
+
+def normalize_condition(cond: str) -> str:
+    """Rewrite ``true``/``false`` literals in a condition as ``1``/``0``."""
+    cond = _TRUE_RE.sub("1", cond)
+    cond = _FALSE_RE.sub("0", cond)
+    return cond
+
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split on blank-line separators, dropping empty paragraphs.
+
+    Same result as ``[p.strip() for p in text.split("\\n\\n") if p.strip()]``
+    but walks the string once without building the intermediate lists.
+    """
+    paras: List[str] = []
+    pos = 0
+    while True:
+        j = text.find("\n\n", pos)
+        chunk = (text[pos:] if j == -1 else text[pos:j]).strip()
+        if chunk:
+            paras.append(chunk)
+        if j == -1:
+            return paras
+        pos = j + 2
+
+
+def _lone_semicolon_line(text: str, start: int, end: int) -> bool:
+    """Return whether ``text[start:end]`` is a lone ``;`` plus whitespace."""
+    return text[start:end].strip() == ";"
+
+
+def block_comment_open(text: str) -> bool:
+    """Return whether ``text`` ends inside a ``;`` block comment.
+
+    Only lines holding a ``;`` are looked at; like Tk's Text widget, lines
+    end at ``"\n"``.
+    """
+    in_block = False
+    n = len(text)
+    idx = text.find(";")
+    while idx != -1:
+        line_start = text.rfind("\n", 0, idx) + 1
+        nl = text.find("\n", idx)
+        line_end = n if nl == -1 else nl
+        if _lone_semicolon_line(text, line_start, line_end):
+            in_block = not in_block
+        idx = text.find(";", line_end)
+    return in_block
+
+
+def comment_spans(text: str, in_block: bool = False) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` offsets of every comment region in ``text``.
+
+    Covers ``;`` comment lines, block comments delimited by lone ``;`` lines
+    and trailing comments after a ``;`` on an ordinary line. ``in_block``
+    is the block-comment state at the start of ``text``. Like Tk's Text
+    widget, lines end at ``"\n"``; each span includes the line's newline.
+    """
+    spans: List[Tuple[int, int]] = []
+    n = len(text)
+    start = 0
+    while start < n:
+        if in_block:
+            # 블록 안에서는 줄마다 구간을 만들고 닫는 ';' 줄을 찾는다.
+            nl = text.find("\n", start)
+            line_end = n if nl == -1 else nl + 1
+            spans.append((start, line_end))
+            if text.find(";", start, line_end) != -1 and _lone_semicolon_line(text, start, line_end):
+                in_block = False
+            start = line_end
+            continue
+
+        # 블록 밖에서는 ';'가 없는 줄을 나누지 않고 다음 ';'가 있는 줄로 건너뛴다.
+        idx = text.find(";", start)
+        if idx == -1:
+            break
+        line_start = text.rfind("\n", start, idx) + 1 or start
+        nl = text.find("\n", idx)
+        line_end = n if nl == -1 else nl + 1
+        if _lone_semicolon_line(text, line_start, line_end):
+            in_block = True
+            spans.append((line_start, line_end))
+        elif idx == line_start or text[line_start:idx].isspace():
+            # 앞 공백 뒤 ';'로 시작하는 주석 줄
+            spans.append((line_start, line_end))
+        else:
+            spans.append((idx, line_end))
+        start = line_end
+    return spans
+
+
+def variable_spans(text: str, names: Iterable[str]) -> List[Tuple[int, int]]:
+    """Return ``(start, end)`` offsets of ``__var__`` tokens naming ``names``.
+
+    The scan mirrors ``BranchingNovelApp._interpolate`` so the editor and the
+    runtime agree on what counts as a placeholder. Candidate tokens come from
+    one regex pass and each name is a single set lookup, so the cost depends
+    on the length of ``text`` and not on how many names are defined; pass a
+    ``set``/``frozenset``.
+    """
+    spans: List[Tuple[int, int]] = []
+    # 앞 토큰이 차지한 끝 위치: 정의된 변수는 닫힘 '__'까지 소비한다.
+    i = 0
+    for m in _VAR_TOKEN_RE.finditer(text):
+        j = m.start()
+        if j < i:
+            continue
+        k = m.end(1)
+        if m.group(1) in names:
+            spans.append((j, k + 2))
+            i = k + 2
+    return spans
+
+
+def find_in_texts(texts: List[str], query: str) -> List[List[int]]:
+    """Return the non-overlapping offsets of ``query`` in each of ``texts``.
+
+    Gives the same offsets as running ``re.finditer(re.escape(query), t)``
+    on every text separately, but searches one ``"\\0"``-joined buffer with
+    ``str.find``, so the scan runs in C however many texts there are. A
+    match cannot cross into the next text unless ``query`` itself holds a
+    NUL character, in which case the texts are searched one by one.
+    """
+    hits: List[List[int]] = [[] for _ in texts]
+    if not query:
+        return hits
+    step = len(query)
+    if "\0" in query:
+        for k, text in enumerate(texts):
+            i = text.find(query)
+            while i != -1:
+                hits[k].append(i)
+                i = text.find(query, i + step)
+        return hits
+    corpus = "\0".join(texts)
+    # 각 텍스트가 corpus에서 시작하는 위치
+    starts: List[int] = []
+    off = 0
+    for text in texts:
+        starts.append(off)
+        off += len(text) + 1
+    last = len(texts) - 1
+    k = 0
+    i = corpus.find(query)
+    while i != -1:
+        # 일치 위치는 늘어나기만 하므로 텍스트 번호도 앞으로만 옮기면 된다.
+        while k < last and starts[k + 1] <= i:
+            k += 1
+        hits[k].append(i - starts[k])
+        i = corpus.find(query, i + step)
+    return hits
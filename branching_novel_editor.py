@@ -33,17 +33,45 @@ import sys
 import re
 import ast
 import argparse
+import difflib
+import stat
+import uuid
 import tkinter as tk
 import tkinter.font as tkfont
 from tkinter import ttk, filedialog, messagebox
 
 from i18n import tr, set_language, set_language_from_file, get_user_lang_file
 from typing import Any, List, Dict, Optional, Callable, Iterable, Tuple, Union, Set
-import copy
+import pickle
+from dataclasses import dataclass, field
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 
 from auto_update import check_for_update
-from story_parser import Choice, Action, Branch, Chapter, Story, ParseError, StoryParser
+from story_parser import (
+    ACTION_OP_SYMBOLS,
+    ACTION_SYMBOL_OPS,
+    Action,
+    Branch,
+    Chapter,
+    Choice,
+    ParseError,
+    Story,
+    StoryParser,
+)
 from branching_novel_app import BranchingNovelApp, VAR_PATTERN
+from _fastparse import (
+    block_comment_open,
+    coerce_value,
+    comment_spans,
+    find_in_texts,
+    normalize_condition,
+    parse_action_rows,
+    split_paragraphs,
+    variable_spans,
+)
 
 
 APP_NAME = "Branching Novel Editor"
@@ -52,6 +80,80 @@ APP_ID = "667FEBC7-64DB-446E-97B5-E6886D5E4660"
 
 COMPARISON_OPERATORS = ["==", "!=", ">", "<", ">=", "<="]
 ASSIGNMENT_OPERATORS = ["=", "+=", "-=", "*=", "/=", "//=", "%=", "**="]
+NUMERIC_OPS = frozenset({"add", "sub", "mul", "div", "floordiv", "mod", "pow"})
+VAR_NAME_RE = re.compile(r"[A-Za-z0-9]+(?:_[A-Za-z0-9]+)*")
+# 변수 이름 입력 중에 허용하는 글자 (키 입력마다 regex 대신 집합 포함 관계로 검사)
+VAR_NAME_INPUT_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_"
+)
+# 조건 트리의 한 줄 "var op value"를 조건 입력 대화상자 값으로 나눌 때 사용
+COND_ROW_RE = re.compile(r"(\w+)\s*(==|!=|>=|<=|>|<)\s*(.+)")
+# 무한 루프 분석의 단순 조건식 파싱용
+LOOP_ATOM_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*(==|!=|>=|<=|>|<)\s*([^\s]+)\s*$", re.IGNORECASE)
+LOOP_AND_RE = re.compile(r"\s+and\s+", re.IGNORECASE)
+# splitlines 기준으로 줄 끝에 붙은 공백 (주석 병합이 그대로 옮겨 붙이는 부분)
+LINE_TRAILING_SPACE_RE = re.compile(r"[^\S\n](?=[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]|\Z)")
+# 저장 시 파일 쓰기 버퍼 크기 (큰 작품도 몇 번의 write로 끝나도록)
+SAVE_BUFFER_SIZE = 1 << 20
+# 임시 파일을 만들 때 쓰는 플래그: 이름이 겹치면 실패하고, Windows에서는 바이너리로 연다.
+_TEMP_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+# 본문/작품 제목 입력이 이만큼(ms) 멈추면 모델 반영과 undo 기록을 한 번에 한다.
+EDIT_COMMIT_DELAY_MS = 300
+# 코드 편집기 입력이 이만큼(ms) 멈추면 백그라운드에서 파싱을 시작한다.
+CODE_PARSE_DELAY_MS = 500
+# 작업자 스레드의 작업(파싱, 파일 쓰기)이 끝났는지 확인하는 간격(ms)
+WORKER_POLL_MS = 50
+# 변수 강조 칸에 붙이는 바인딩 태그
+VAR_HIGHLIGHT_TAG = "VarHighlight"
+# 변수 드래그 중 마우스 이동을 처리하는 최소 간격(ms), 약 60Hz
+DRAG_MOTION_INTERVAL_MS = 16
+# 코드 편집기 갱신에서 바뀐 구간이 이 줄 수 이상이면 그 안을 다시 비교해 여러 조각으로 고친다.
+CODE_PATCH_DIFF_MIN_LINES = 64
+# 조각이 이보다 많으면 Tk 호출이 늘어나는 쪽이 손해라 구간 전체를 한 번에 바꾼다.
+CODE_PATCH_MAX_HUNKS = 32
+
+
+# 위젯별 변수 강조용 굵은 글꼴 (키 입력마다 Font를 새로 만들지 않도록 한 번만 만든다)
+_HIGHLIGHT_FONTS: "WeakKeyDictionary[tk.Text, tkfont.Font]" = WeakKeyDictionary()
+# 위젯별 마지막 전체 강조 때의 (텍스트, 변수 집합)
+_HIGHLIGHT_STATE: "WeakKeyDictionary[tk.Text, Tuple[str, frozenset]]" = WeakKeyDictionary()
+
+
+def _configure_highlight_tags(widget: tk.Text) -> None:
+    """Set up the ``comment``/``var`` tag styles of ``widget`` on first use."""
+    if widget in _HIGHLIGHT_FONTS:
+        return
+    widget.tag_configure("comment", foreground="gray")
+    highlight_font = tkfont.Font(font=widget.cget("font"))
+    highlight_font.configure(weight="bold")
+    widget.tag_configure("var", foreground="navy", font=highlight_font)
+    _HIGHLIGHT_FONTS[widget] = highlight_font
+
+
+def _tag_spans(
+    widget: tk.Text, tag: str, text: str, first_line: int, spans: List[Tuple[int, int]]
+) -> None:
+    """Tag every ``(start, end)`` offset pair of ``text`` in one Tk call.
+
+    ``text`` starts at line ``first_line`` of ``widget`` and ``spans`` must be
+    in ascending order. Offsets become ``line.col`` indices, which Tk
+    resolves directly instead of counting characters from ``"1.0"``.
+    """
+    if not spans:
+        return
+    indices: List[str] = []
+    line = first_line
+    line_start = 0
+    nl = text.find("\n")
+    for span in spans:
+        for off in span:
+            while nl != -1 and nl < off:
+                line += 1
+                line_start = nl + 1
+                nl = text.find("\n", line_start)
+            indices.append(f"{line}.{off - line_start}")
+    # tag add는 여러 구간을 한 번에 받으므로 구간마다 Tcl을 왕복하지 않는다.
+    widget.tag_add(tag, *indices)
 
 
 def highlight_variables(widget: tk.Text, get_vars: Callable[[], Iterable[str]]) -> None:
@@ -60,95 +162,308 @@ def highlight_variables(widget: tk.Text, get_vars: Callable[[], Iterable[str]])
     The scanning logic mirrors ``BranchingNovelApp``'s variable interpolation
     so that the editor and runtime interpret placeholders identically.
     """
+    try:
+        text = widget.get("1.0", "end-1c")
+    except tk.TclError:
+        return
+    _highlight_text(widget, text, frozenset(get_vars()) if get_vars else frozenset())
+
+
+def highlight_variables_if_changed(widget: tk.Text, get_vars: Callable[[], Iterable[str]]) -> None:
+    """Like ``highlight_variables`` but skip the pass when nothing changed.
+
+    Meant for ``<KeyRelease>`` bindings, where arrow keys and modifiers fire
+    without editing. Code that rewrites the widget must call
+    ``highlight_variables`` so the recorded state stays accurate.
+    """
+    try:
+        text = widget.get("1.0", "end-1c")
+    except tk.TclError:
+        return
+    vars_set = frozenset(get_vars()) if get_vars else frozenset()
+    if _HIGHLIGHT_STATE.get(widget) == (text, vars_set):
+        return
+    _highlight_text(widget, text, vars_set)
+
+
+def _highlight_text(widget: tk.Text, text: str, vars_set: frozenset) -> None:
     try:
         widget.tag_remove("var", "1.0", tk.END)
         widget.tag_remove("comment", "1.0", tk.END)
     except tk.TclError:
         return
-
-    text = widget.get("1.0", "end-1c")
+    _configure_highlight_tags(widget)
 
     # 주석 처리: 일반/블록/줄 옆 주석 모두 회색으로 표시
-    start = 0
-    in_block = False
-    for line in text.splitlines(True):
-        stripped = line.strip()
-        lstripped = line.lstrip()
-        line_start = f"1.0+{start}c"
-        line_end = f"1.0+{start + len(line)}c"
-
-        if in_block:
-            widget.tag_add("comment", line_start, line_end)
-            if stripped == ";":
-                in_block = False
-            start += len(line)
+    # (';'나 '__'가 없는 짧은 제목 칸은 줄 나누기/스캔 없이 끝난다)
+    if ";" in text:
+        _tag_spans(widget, "comment", text, 1, comment_spans(text))
+
+    if vars_set and "__" in text:
+        _tag_spans(widget, "var", text, 1, variable_spans(text, vars_set))
+    _HIGHLIGHT_STATE[widget] = (text, vars_set)
+
+
+def highlight_variables_range(
+    widget: tk.Text, get_vars: Callable[[], Iterable[str]], first_line: int, last_line: int
+) -> None:
+    """Re-run ``highlight_variables`` for lines ``first_line``..``last_line`` only.
+
+    ``__var__`` tokens never span lines, so rescanning whole lines tags them
+    exactly as a full pass would. The block-comment state is recovered from
+    the lines above; callers must widen the range (or highlight everything)
+    when an edit may have opened or closed a block comment.
+    """
+    start = f"{first_line}.0"
+    stop = f"{last_line + 1}.0"
+    try:
+        widget.tag_remove("var", start, stop)
+        widget.tag_remove("comment", start, stop)
+    except tk.TclError:
+        return
+
+    text = widget.get(start, stop)
+    if widget.compare(stop, ">=", "end"):
+        # 마지막 줄이면 Text가 덧붙이는 줄바꿈은 제외
+        text = text[:-1]
+    _configure_highlight_tags(widget)
+
+    in_block = block_comment_open(widget.get("1.0", start)) if first_line > 1 else False
+    if in_block or ";" in text:
+        _tag_spans(widget, "comment", text, first_line, comment_spans(text, in_block))
+
+    if "__" in text:
+        vars_set = frozenset(get_vars()) if get_vars else frozenset()
+        if vars_set:
+            _tag_spans(widget, "var", text, first_line, variable_spans(text, vars_set))
+
+
+def changed_line_span(old_lines: List[str], new_lines: List[str]) -> Tuple[int, int]:
+    """Return how many leading and trailing lines ``old_lines`` and ``new_lines`` share.
+
+    The two counts never overlap, so ``new_lines[head:len(new_lines) - tail]``
+    is the changed block.
+    """
+    limit = min(len(old_lines), len(new_lines))
+    head = 0
+    while head < limit and old_lines[head] == new_lines[head]:
+        head += 1
+    tail = 0
+    limit -= head
+    while tail < limit and old_lines[-1 - tail] == new_lines[-1 - tail]:
+        tail += 1
+    return head, tail
+
+
+def replace_changed_lines(widget: tk.Text, old: str, new: str) -> bool:
+    """Rewrite only the lines of ``widget`` that differ between ``old`` and ``new``.
+
+    ``old`` must be the widget's current content (``"1.0"`` to ``"end-1c"``).
+    Returns ``False`` when nothing needed to change.
+    """
+    if old == new:
+        return False
+    old_lines = old.split("\n")
+    new_lines = new.split("\n")
+    head, tail = changed_line_span(old_lines, new_lines)
+
+    if tail:
+        old_end = len(old_lines) - tail
+        new_end = len(new_lines) - tail
+        if min(old_end, new_end) - head >= CODE_PATCH_DIFF_MIN_LINES:
+            # 분기 id 변경처럼 멀리 떨어진 여러 줄이 바뀐 경우: 사이의 같은 줄은 두고 고친다.
+            hunks = [
+                op for op in difflib.SequenceMatcher(
+                    None, old_lines[head:old_end], new_lines[head:new_end]
+                ).get_opcodes()
+                if op[0] != "equal"
+            ]
+            if len(hunks) <= CODE_PATCH_MAX_HUNKS:
+                # 뒤 조각부터 고쳐야 앞 조각의 줄 번호가 그대로다.
+                for _, i1, i2, j1, j2 in reversed(hunks):
+                    widget.replace(
+                        f"{head + i1 + 1}.0",
+                        f"{head + i2 + 1}.0",
+                        "".join(ln + "\n" for ln in new_lines[head + j1:head + j2]),
+                    )
+                return True
+        # 뒤쪽에 남는 줄이 있으면 줄 단위로 통째로 바꾼다.
+        start = f"{head + 1}.0"
+        end = f"{old_end + 1}.0"
+        chunk = "".join(ln + "\n" for ln in new_lines[head:new_end])
+    elif head:
+        # 끝까지 바뀐 경우: 앞 줄의 끝에서부터 잘라 마지막 줄바꿈 처리를 맞춘다.
+        start = f"{head}.end"
+        end = "end-1c"
+        chunk = "".join("\n" + ln for ln in new_lines[head:])
+    else:
+        start = "1.0"
+        end = "end-1c"
+        chunk = new
+    # delete+insert 대신 한 번의 Tk 호출로 교체해 레이아웃 계산도 한 번만 일어나게 한다.
+    widget.replace(start, end, chunk)
+    return True
+
+
+def parse_editor_code(text: str) -> Story:
+    """Parse code-editor text, keeping comments in branch titles and bodies.
+
+    Touches no widgets, so it may run on a worker thread.
+    """
+    parser = StoryParser()
+    story = parser.parse(text)
+    # 댓글이 포함된 원본에서 분기 제목과 본문을 다시 추출
+    branch_texts = parser.extract_branch_texts(text)
+    for bid, br in story.branches.items():
+        if bid in branch_texts:
+            title, body = branch_texts[bid]
+            br.title = title
+            br.raw_text = body
+    return story
+
+
+def write_text_atomic(path: str, text: str, suffix: str = "") -> None:
+    """Write ``text`` and then ``suffix`` to ``path`` as UTF-8 without a torn file on failure.
+
+    The text goes to a uniquely named temporary file next to the real target
+    (symlinks are resolved, so a linked file stays a link) and is moved over
+    it with ``os.replace`` only after it was written completely. The target's
+    permission bits are kept; a new file gets the usual umask-based mode.
+    ``suffix`` goes out with a second write so callers need not build a
+    concatenated copy of a large ``text``.
+    """
+    target = os.path.realpath(path)
+    dirname, basename = os.path.split(target)
+    while True:
+        tmp = os.path.join(dirname or ".", f"{basename}.{uuid.uuid4().hex[:12]}.tmp")
+        try:
+            # mkstemp와 달리 0o666으로 만들어 새 파일은 커널이 umask를 적용한 기본 권한을 받는다.
+            fd = os.open(tmp, _TEMP_OPEN_FLAGS, 0o666)
+            break
+        except FileExistsError:
             continue
+    try:
+        with open(fd, "w", encoding="utf-8", buffering=SAVE_BUFFER_SIZE) as f:
+            f.write(text)
+            if suffix:
+                f.write(suffix)
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(target).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
 
-        if stripped == ";":
-            in_block = True
-            widget.tag_add("comment", line_start, line_end)
-        elif lstripped.startswith(";"):
-            widget.tag_add("comment", line_start, line_end)
-        else:
-            idx = line.find(";")
-            if idx != -1:
-                widget.tag_add("comment", f"1.0+{start + idx}c", line_end)
-        start += len(line)
 
-    widget.tag_configure("comment", foreground="gray")
+def write_story_file(path: str, txt: str) -> None:
+    """Save story text ``txt`` plus a final newline to ``path`` via ``write_text_atomic``."""
+    write_text_atomic(path, txt, suffix="\n")
 
-    vars_set = set(get_vars()) if get_vars else set()
-    if vars_set:
-        i = 0
-        n = len(text)
-        while i < n:
-            j = text.find("__", i)
-            if j == -1:
-                break
-
-            k = j + 2
-            m = re.match(r"([A-Za-z0-9]+(?:_[A-Za-z0-9]+)*)", text[k:])
-            if not m:
-                # 슬라이딩: '___var__'처럼 '__' 뒤에 식별자가 없으면 '_'만 소비
-                i = j + 1
-                continue
 
-            name = m.group(1)
-            k += m.end()
+@lru_cache(maxsize=1024)
+def parse_action_value(token: str) -> Union[int, float, bool, str]:
+    """Convert an action-dialog value into ``bool``/``int``/``float``/``str``.
+
+    Malformed quoted text raises from ``ast.literal_eval``. Results are
+    immutable, so they are cached per token across dialog OK presses.
+    """
+    t = token.lower()
+    if t == "true":
+        return True
+    if t == "false":
+        return False
+    if (token.startswith('"') and token.endswith('"')) or (
+        token.startswith("'") and token.endswith("'")
+    ):
+        return ast.literal_eval(token)
+    try:
+        return int(token)
+    except ValueError:
+        try:
+            return float(token)
+        except ValueError:
+            return token
 
-            if k + 2 <= n and text.startswith("__", k):
-                if name in vars_set:
-                    start_pos = f"1.0+{j}c"
-                    end_pos = f"1.0+{k + 2}c"
-                    widget.tag_add("var", start_pos, end_pos)
-                # 정의 여부에 따라 소비 범위 결정
-                i = k + 2 if name in vars_set else k
-            else:
-                # 슬라이딩: 닫힘 '__'가 없으면 '_'만 소비
-                i = j + 1
 
-        # 변수 스타일 설정
-        base_font = tkfont.Font(font=widget.cget("font"))
-        highlight_font = base_font.copy()
-        highlight_font.configure(weight="bold")
-        widget.tag_configure("var", foreground="navy", font=highlight_font)
+@lru_cache(maxsize=4096)
+def parse_loop_number(val_text: str) -> Optional[float]:
+    """Parse a guard constant for loop analysis (``true``/``false`` count as 1/0)."""
+    vv = val_text.strip().lower()
+    if vv == "true":  return 1.0
+    if vv == "false": return 0.0
+    # 구간은 어차피 float이므로 정수도 float()로 바로 읽는다.
+    try:
+        return float(vv)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_loop_condition(cond_text: str) -> Optional[Tuple[Tuple[str, str, float], ...]]:
+    """Split an AND-only guard into ``(var, op, number)`` atoms.
+
+    Returns ``None`` for conditions the loop analysis cannot reason about.
+    Results are cached per condition string since stories repeat guards a lot.
+    """
+    if not cond_text or cond_text.strip() == "": return ()
+    lc = cond_text.lower()
+    if " or " in lc or " not " in lc or "(" in lc or ")" in lc or "|" in cond_text or "&" in cond_text:
+        return None  # 복잡식은 불확실
+    atoms = []
+    for part in LOOP_AND_RE.split(cond_text):
+        m = LOOP_ATOM_RE.match(part)
+        if not m: return None
+        var, op, val = m.groups()
+        c = parse_loop_number(val)
+        if c is None: return None
+        atoms.append((var, op, c))
+    return tuple(atoms)
 
 
 # ---------- 에디터 GUI ----------
 
 
 class UndoManager:
-    """Simple undo/redo manager storing deep copies of editor state."""
+    """Simple undo/redo manager storing pickled snapshots of editor state.
+
+    Each snapshot is taken with the C pickler instead of ``copy.deepcopy``
+    and kept as bytes; restoring unpickles a fresh copy, so ``set_state``
+    may keep the object it is given. With ``copy_state=False`` the states
+    are stored as returned by ``get_state`` and must already be immutable.
+    At most ``MAX_UNDO`` snapshots are kept; the oldest ones fall off as
+    new edits are recorded.
+    """
+
+    MAX_UNDO = 200
 
-    def __init__(self, get_state: Callable[[], Any], set_state: Callable[[Any], None]):
+    def __init__(
+        self,
+        get_state: Callable[[], Any],
+        set_state: Callable[[Any], None],
+        copy_state: bool = True,
+    ):
         self._get_state = get_state
         self._set_state = set_state
-        self._undo_stack: List[Any] = [copy.deepcopy(self._get_state())]
+        self._copy_state = copy_state
+        self._undo_stack: "deque[Any]" = deque([self._snapshot()], maxlen=self.MAX_UNDO)
         self._redo_stack: List[Any] = []
 
+    def _snapshot(self) -> Any:
+        if not self._copy_state:
+            return self._get_state()
+        return pickle.dumps(self._get_state(), pickle.HIGHEST_PROTOCOL)
+
+    def _load(self, state: Any) -> Any:
+        return pickle.loads(state) if self._copy_state else state
+
     def record(self) -> None:
         """Record a new state for undo."""
-        self._undo_stack.append(copy.deepcopy(self._get_state()))
+        self._undo_stack.append(self._snapshot())
         self._redo_stack.clear()
 
     def undo(self) -> None:
@@ -156,38 +471,40 @@ class UndoManager:
             return
         state = self._undo_stack.pop()
         self._redo_stack.append(state)
-        self._set_state(copy.deepcopy(self._undo_stack[-1]))
+        self._set_state(self._load(self._undo_stack[-1]))
 
     def redo(self) -> None:
         if not self._redo_stack:
             return
         state = self._redo_stack.pop()
         self._undo_stack.append(state)
-        self._set_state(copy.deepcopy(state))
+        self._set_state(self._load(state))
 
 class ConditionRowDialog(tk.Toplevel):
-    def __init__(
-        self,
-        master,
-        variables: List[str],
-        initial: Optional[Tuple[str, str, str]],
-        operators: List[str],
-    ):
+    """Modal "variable / operator / value" row editor.
+
+    Each owner builds one instance and reuses it through ``ask``; OK and
+    Cancel only hide the window, and Tk destroys it along with its owner.
+    """
+
+    def __init__(self, master):
         super().__init__(master)
+        self.withdraw()
         self.title(tr("condition_action_title"))
         self.resizable(False, False)
         self.result_ok = False
         self.condition: Optional[Tuple[str, str, str]] = None
+        self._done = tk.BooleanVar(self, False)
 
         frm = ttk.Frame(self, padding=10)
         frm.grid(row=0, column=0, sticky="nsew")
 
         ttk.Label(frm, text=tr("variable")).grid(row=0, column=0, sticky="w")
-        self.cmb_var = ttk.Combobox(frm, values=variables, state="readonly", width=20)
+        self.cmb_var = ttk.Combobox(frm, state="readonly", width=20)
         self.cmb_var.grid(row=1, column=0, sticky="ew", pady=(0,8))
 
         ttk.Label(frm, text=tr("operator")).grid(row=0, column=1, sticky="w", padx=(8,0))
-        self.cmb_op = ttk.Combobox(frm, values=operators, state="readonly", width=7)
+        self.cmb_op = ttk.Combobox(frm, state="readonly", width=7)
         self.cmb_op.grid(row=1, column=1, sticky="w", padx=(8,0))
 
         ttk.Label(frm, text=tr("value")).grid(row=0, column=2, sticky="w", padx=(8,0))
@@ -203,26 +520,52 @@ class ConditionRowDialog(tk.Toplevel):
         ok.grid(row=0, column=0, padx=5)
         cancel.grid(row=0, column=1)
 
+        self.bind("<Return>", lambda e: self._ok())
+        self.bind("<Escape>", lambda e: self._cancel())
+        self.bind("<Destroy>", self._on_destroy)
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+
+    def ask(
+        self,
+        variables: List[str],
+        initial: Optional[Tuple[str, str, str]],
+        operators: List[str],
+    ) -> bool:
+        """Show the dialog filled from ``initial`` and wait for OK/Cancel."""
+        self.result_ok = False
+        self.condition = None
+        vals = list(variables)
+        self.cmb_op["values"] = operators
+        self.ent_val.delete(0, tk.END)
         if initial:
             var, op, val = initial
-            vals = list(self.cmb_var["values"])
             if var not in vals:
                 vals.append(var)
-                self.cmb_var["values"] = vals
+            self.cmb_var["values"] = vals
             self.cmb_var.set(var)
             self.cmb_op.set(op)
             self.ent_val.insert(0, val)
         else:
-            if variables:
-                self.cmb_var.current(0)
-            if operators:
-                self.cmb_op.current(0)
+            self.cmb_var["values"] = vals
+            self.cmb_var.set(vals[0] if vals else "")
+            self.cmb_op.set(operators[0] if operators else "")
 
-        self.bind("<Return>", lambda e: self._ok())
-        self.bind("<Escape>", lambda e: self._cancel())
+        self._done.set(False)
+        self.deiconify()
         self.grab_set()
         self.cmb_var.focus_set()
-        self.wait_window(self)
+        self.wait_variable(self._done)
+        return self.result_ok
+
+    def _close(self):
+        self.grab_release()
+        self.withdraw()
+        self._done.set(True)
+
+    def _on_destroy(self, event):
+        # 기다리는 중에 소유 창과 함께 파괴되면 ask가 빠져나오게 한다.
+        if event.widget is self:
+            self._done.set(True)
 
     def _ok(self):
         var = self.cmb_var.get().strip()
@@ -233,21 +576,24 @@ class ConditionRowDialog(tk.Toplevel):
             return
         self.condition = (var, op, val)
         self.result_ok = True
-        self.destroy()
+        self._close()
 
     def _cancel(self):
         self.result_ok = False
-        self.destroy()
+        self._close()
 
 
 class VariableDialog(tk.Toplevel):
-    def __init__(self, master, name: str = "", value: Optional[Union[int, float, bool, str]] = None):
+    """Modal name / initial-value editor, reused through ``ask`` like ``ConditionRowDialog``."""
+
+    def __init__(self, master):
         super().__init__(master)
-        self.title(tr("add_variable") if not name else tr("edit_variable"))
+        self.withdraw()
         self.resizable(False, False)
         self.result_ok = False
-        self.var_name: str = name
-        self.value: Union[int, float, bool, str] = value if value is not None else 0
+        self.var_name: str = ""
+        self.value: Union[int, float, bool, str] = 0
+        self._done = tk.BooleanVar(self, False)
 
         frm = ttk.Frame(self, padding=10)
         frm.grid(row=0, column=0, sticky="nsew")
@@ -257,19 +603,10 @@ class VariableDialog(tk.Toplevel):
         vcmd = (self.register(self._validate_name), "%P")
         self.ent_name.configure(validatecommand=vcmd)
         self.ent_name.grid(row=1, column=0, sticky="ew", pady=(0,8))
-        if name:
-            self.ent_name.insert(0, name)
 
         ttk.Label(frm, text=tr("initial_value")).grid(row=0, column=1, sticky="w", padx=(8,0))
         self.ent_val = ttk.Entry(frm, width=10)
         self.ent_val.grid(row=1, column=1, sticky="ew", padx=(8,0))
-        if value is not None:
-            if isinstance(value, bool):
-                self.ent_val.insert(0, str(value).lower())
-            elif isinstance(value, str):
-                self.ent_val.insert(0, f"{value!r}")
-            else:
-                self.ent_val.insert(0, str(value))
 
         btns = ttk.Frame(frm)
         btns.grid(row=2, column=0, columnspan=2, sticky="e", pady=(10,0))
@@ -280,9 +617,42 @@ class VariableDialog(tk.Toplevel):
 
         self.bind("<Return>", lambda e: self._ok())
         self.bind("<Escape>", lambda e: self._cancel())
+        self.bind("<Destroy>", self._on_destroy)
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+
+    def ask(self, name: str = "", value: Optional[Union[int, float, bool, str]] = None) -> bool:
+        """Show the dialog for a new (``name`` empty) or existing variable and wait."""
+        self.title(tr("add_variable") if not name else tr("edit_variable"))
+        self.result_ok = False
+        self.var_name = name
+        self.value = value if value is not None else 0
+        self.ent_name.delete(0, tk.END)
+        if name:
+            self.ent_name.insert(0, name)
+        self.ent_val.delete(0, tk.END)
+        if value is not None:
+            if isinstance(value, bool):
+                self.ent_val.insert(0, str(value).lower())
+            elif isinstance(value, str):
+                self.ent_val.insert(0, f"{value!r}")
+            else:
+                self.ent_val.insert(0, str(value))
+
+        self._done.set(False)
+        self.deiconify()
         self.grab_set()
         self.ent_name.focus_set()
-        self.wait_window(self)
+        self.wait_variable(self._done)
+        return self.result_ok
+
+    def _close(self):
+        self.grab_release()
+        self.withdraw()
+        self._done.set(True)
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self._done.set(True)
 
     def _ok(self):
         name = self.ent_name.get().strip()
@@ -290,41 +660,25 @@ class VariableDialog(tk.Toplevel):
         if not name or not val_text:
             messagebox.showerror(tr("error"), tr("input_var_init_required"))
             return
-        if not re.fullmatch(r"[A-Za-z0-9]+(?:_[A-Za-z0-9]+)*", name):
+        if not VAR_NAME_RE.fullmatch(name):
             messagebox.showerror(tr("error"), tr("invalid_variable_name"))
             return
-        if val_text.lower() == "true":
-            val: Union[int, float, bool, str] = True
-        elif val_text.lower() == "false":
-            val = False
-        elif (val_text.startswith('"') and val_text.endswith('"')) or (
-            val_text.startswith("'") and val_text.endswith("'")
-        ):
-            try:
-                val = ast.literal_eval(val_text)
-            except Exception:
-                messagebox.showerror(tr("error"), tr("invalid_initial_value"))
-                return
-        else:
-            try:
-                val = int(val_text)
-            except ValueError:
-                try:
-                    val = float(val_text)
-                except ValueError:
-                    # Allow plain strings without quotes
-                    val = val_text
+        try:
+            val = coerce_value(val_text)
+        except Exception:
+            messagebox.showerror(tr("error"), tr("invalid_initial_value"))
+            return
         self.var_name = name
         self.value = val
         self.result_ok = True
-        self.destroy()
+        self._close()
 
     def _cancel(self):
         self.result_ok = False
-        self.destroy()
+        self._close()
 
     def _validate_name(self, proposed: str) -> bool:
-        return bool(re.fullmatch(r"[A-Za-z0-9_]*", proposed))
+        return VAR_NAME_INPUT_CHARS.issuperset(proposed)
 
 
 class ActionDialog(tk.Toplevel):
@@ -336,6 +690,9 @@ class ActionDialog(tk.Toplevel):
         self.variables = variables
         self.story = story
         self.actions_raw: List[Tuple[str, str, str]] = self._parse_initial(initial)
+        # 행/변수 입력 창은 처음 쓸 때 만들고 이 창이 닫힐 때까지 다시 쓴다.
+        self._row_dlg: Optional[ConditionRowDialog] = None
+        self._var_dlg: Optional[VariableDialog] = None
 
         frm = ttk.Frame(self, padding=10)
         frm.grid(row=0, column=0, sticky="nsew")
@@ -374,37 +731,34 @@ class ActionDialog(tk.Toplevel):
         self.wait_window(self)
 
     def _parse_initial(self, expr: str) -> List[Tuple[str, str, str]]:
-        acts: List[Tuple[str, str, str]] = []
-        if not expr:
-            return acts
-        parts = [p.strip() for p in expr.split(";") if p.strip()]
-        for part in parts:
-            m = re.match(r"\s*(\w+)\s*(=|\+=|-=|\*=|/=|//=|%=|\*\*=)\s*(.+)\s*", part)
-            if m:
-                acts.append((m.group(1), m.group(2), m.group(3)))
-        return acts
+        return parse_action_rows(expr)
 
     def _refresh_tree(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+        # 처음 채울 때만 쓴다. 이후 추가/편집/삭제는 해당 행만 바꾼다.
+        self.tree.delete(*self.tree.get_children())
         for var, op, val in self.actions_raw:
             self.tree.insert("", tk.END, values=(var, op, val))
 
+    def _row_dialog(self) -> ConditionRowDialog:
+        if self._row_dlg is None:
+            self._row_dlg = ConditionRowDialog(self)
+        return self._row_dlg
+
     def _add(self):
-        dlg = ConditionRowDialog(self, self.variables, None, ASSIGNMENT_OPERATORS)
-        if dlg.result_ok and dlg.condition:
+        dlg = self._row_dialog()
+        if dlg.ask(self.variables, None, ASSIGNMENT_OPERATORS) and dlg.condition:
             self.actions_raw.append(dlg.condition)
-            self._refresh_tree()
+            self.tree.insert("", tk.END, values=dlg.condition)
 
     def _edit(self):
         sel = self.tree.selection()
         if not sel:
             return
         idx = self.tree.index(sel[0])
-        dlg = ConditionRowDialog(self, self.variables, self.actions_raw[idx], ASSIGNMENT_OPERATORS)
-        if dlg.result_ok and dlg.condition:
+        dlg = self._row_dialog()
+        if dlg.ask(self.variables, self.actions_raw[idx], ASSIGNMENT_OPERATORS) and dlg.condition:
             self.actions_raw[idx] = dlg.condition
-            self._refresh_tree()
+            self.tree.item(sel[0], values=dlg.condition)
 
     def _delete(self):
         sel = self.tree.selection()
@@ -412,40 +766,30 @@ class ActionDialog(tk.Toplevel):
             return
         idx = self.tree.index(sel[0])
         self.actions_raw.pop(idx)
-        self._refresh_tree()
+        self.tree.delete(sel[0])
 
     def _add_variable(self):
-        dlg = VariableDialog(self)
-        if dlg.result_ok:
+        if self._var_dlg is None:
+            self._var_dlg = VariableDialog(self)
+        dlg = self._var_dlg
+        if dlg.ask():
             self.story.variables[dlg.var_name] = dlg.value
             if dlg.var_name not in self.variables:
                 self.variables.append(dlg.var_name)
             editor = self.master.master
-            editor._set_dirty(True)
-            editor._refresh_variable_list()
-            editor._update_code_editor()
-            editor.undo_manager.record()
+            editor._invalidate_vars_cache()
+            editor._schedule_ui_refresh()
 
     def _ok(self):
         self.action_str = "; ".join(f"{v} {op} {val}" for v, op, val in self.actions_raw)
         self.actions: List[Action] = []
-        op_map = {
-            "=": "set",
-            "+=": "add",
-            "-=": "sub",
-            "*=": "mul",
-            "/=": "div",
-            "//=": "floordiv",
-            "%=": "mod",
-            "**=": "pow",
-        }
         for v, op, val in self.actions_raw:
             try:
-                parsed = self._parse_value(val)
+                parsed = parse_action_value(val)
                 if op == "=":
                     self.actions.append(Action(op="set", var=v, value=parsed))
                 else:
-                    self.actions.append(Action(op=op_map[op], var=v, value=parsed))
+                    self.actions.append(Action(op=ACTION_SYMBOL_OPS[op], var=v, value=parsed))
             except Exception:
                 self.actions.append(Action(op="expr", var=v, value=val))
         self.result_ok = True
@@ -455,23 +799,24 @@ class ActionDialog(tk.Toplevel):
         self.result_ok = False
         self.destroy()
 
-    def _parse_value(self, token: str) -> Union[int, float, bool, str]:
-        t = token.lower()
-        if t == "true":
-            return True
-        if t == "false":
-            return False
-        if (token.startswith('"') and token.endswith('"')) or (
-            token.startswith("'") and token.endswith("'")
-        ):
-            return ast.literal_eval(token)
-        try:
-            return int(token)
-        except ValueError:
-            try:
-                return float(token)
-            except ValueError:
-                return token
+
+@dataclass(eq=False)
+class CondNode:
+    """One row of the condition tree: an AND/OR group or a single comparison."""
+
+    kind: str  # "op" | "cond"
+    expr: str  # "and"/"or" for groups, the comparison text otherwise
+    iid: str = ""
+    parent: Optional["CondNode"] = None
+    children: List["CondNode"] = field(default_factory=list)
+
+    def contains(self, other: "CondNode") -> bool:
+        node: Optional[CondNode] = other
+        while node is not None:
+            if node is self:
+                return True
+            node = node.parent
+        return False
 
 
 class ConditionDialog(tk.Toplevel):
@@ -487,7 +832,8 @@ class ConditionDialog(tk.Toplevel):
         frm.rowconfigure(0, weight=1)
         frm.columnconfigure(0, weight=1)
 
-        self.tree = ttk.Treeview(frm, columns=("kind", "expr"), show="tree")
+        # 조건 트리의 실제 상태는 CondNode 모델에 두고, Treeview는 보여 주기만 한다.
+        self.tree = ttk.Treeview(frm, show="tree")
         self.tree.grid(row=0, column=0, sticky="nsew")
 
         btns = ttk.Frame(frm)
@@ -505,7 +851,11 @@ class ConditionDialog(tk.Toplevel):
         ok.grid(row=0, column=0, padx=5)
         cancel.grid(row=0, column=1)
 
-        self.root_item = self.tree.insert("", tk.END, text="AND", values=("op", "and"))
+        self._nodes: Dict[str, CondNode] = {}
+        # 조건 행 입력 창은 처음 쓸 때 만들고 이 창이 닫힐 때까지 다시 쓴다.
+        self._row_dlg: Optional[ConditionRowDialog] = None
+        self.root_node = self._insert_node(None, "op", "and")
+        self.root_item = self.root_node.iid
         self._parse_initial(initial)
 
         self.tree.bind("<ButtonPress-1>", self._start_drag)
@@ -515,59 +865,91 @@ class ConditionDialog(tk.Toplevel):
         self.tree.focus_set()
         self.wait_window(self)
 
+    @staticmethod
+    def _node_text(kind: str, expr: str) -> str:
+        return expr.upper() if kind == "op" else expr
+
+    def _insert_node(self, parent: Optional[CondNode], kind: str, expr: str) -> CondNode:
+        node = CondNode(kind, expr, parent=parent)
+        node.iid = self.tree.insert(
+            parent.iid if parent else "", tk.END, text=self._node_text(kind, expr)
+        )
+        if parent is not None:
+            parent.children.append(node)
+        self._nodes[node.iid] = node
+        return node
+
+    def _group_for_selection(self) -> CondNode:
+        """Return the group new rows go into: the selected group or the selected row's group."""
+        sel = self.tree.selection()
+        if not sel:
+            return self.root_node
+        node = self._nodes[sel[0]]
+        return node if node.kind == "op" else node.parent
+
     def _start_drag(self, event):
         self._drag_item = self.tree.identify_row(event.y)
 
     def _drop(self, event):
         if not getattr(self, "_drag_item", None):
             return
-        target = self.tree.identify_row(event.y)
-        if not target:
-            target = self.root_item
-        kind = self.tree.set(target, "kind")
-        if kind != "op":
-            target = self.tree.parent(target)
-        self.tree.move(self._drag_item, target, "end")
+        node = self._nodes[self._drag_item]
         self._drag_item = None
+        target_item = self.tree.identify_row(event.y)
+        target = self._nodes[target_item] if target_item else self.root_node
+        if target.kind != "op":
+            target = target.parent
+        # 루트나 자기 자신/하위 그룹으로는 옮길 수 없다.
+        if node is self.root_node or node.contains(target):
+            return
+        node.parent.children.remove(node)
+        target.children.append(node)
+        node.parent = target
+        self.tree.move(node.iid, target.iid, "end")
+
+    def _row_dialog(self) -> ConditionRowDialog:
+        if self._row_dlg is None:
+            self._row_dlg = ConditionRowDialog(self)
+        return self._row_dlg
 
     def _add_condition(self):
-        sel = self.tree.selection()
-        parent = sel[0] if sel and self.tree.set(sel[0], "kind") == "op" else self.tree.parent(sel[0]) if sel else self.root_item
-        dlg = ConditionRowDialog(self, self.variables, None, COMPARISON_OPERATORS)
-        if dlg.result_ok and dlg.condition:
+        parent = self._group_for_selection()
+        dlg = self._row_dialog()
+        if dlg.ask(self.variables, None, COMPARISON_OPERATORS) and dlg.condition:
             expr = f"{dlg.condition[0]} {dlg.condition[1]} {dlg.condition[2]}"
-            self.tree.insert(parent, tk.END, text=expr, values=("cond", expr))
+            self._insert_node(parent, "cond", expr)
 
     def _add_group(self, op: str):
-        sel = self.tree.selection()
-        parent = sel[0] if sel and self.tree.set(sel[0], "kind") == "op" else self.tree.parent(sel[0]) if sel else self.root_item
-        text = op.upper()
-        self.tree.insert(parent, tk.END, text=text, values=("op", op))
+        self._insert_node(self._group_for_selection(), "op", op)
 
     def _edit(self):
         sel = self.tree.selection()
         if not sel:
             return
-        item = sel[0]
-        kind = self.tree.set(item, "kind")
-        if kind == "cond":
-            expr = self.tree.set(item, "expr")
-            m = re.match(r"(\w+)\s*(==|!=|>=|<=|>|<)\s*(.+)", expr)
+        node = self._nodes[sel[0]]
+        if node.kind == "cond":
+            m = COND_ROW_RE.match(node.expr)
             initial = m.groups() if m else None
-            dlg = ConditionRowDialog(self, self.variables, initial, COMPARISON_OPERATORS)
-            if dlg.result_ok and dlg.condition:
-                expr = f"{dlg.condition[0]} {dlg.condition[1]} {dlg.condition[2]}"
-                self.tree.item(item, text=expr, values=("cond", expr))
+            dlg = self._row_dialog()
+            if not (dlg.ask(self.variables, initial, COMPARISON_OPERATORS) and dlg.condition):
+                return
+            node.expr = f"{dlg.condition[0]} {dlg.condition[1]} {dlg.condition[2]}"
         else:
-            op = self.tree.set(item, "expr")
-            new_op = "or" if op == "and" else "and"
-            self.tree.item(item, text=new_op.upper(), values=("op", new_op))
+            node.expr = "or" if node.expr == "and" else "and"
+        self.tree.item(node.iid, text=self._node_text(node.kind, node.expr))
 
     def _delete(self):
         sel = self.tree.selection()
         if not sel or sel[0] == self.root_item:
             return
-        self.tree.delete(sel[0])
+        node = self._nodes[sel[0]]
+        node.parent.children.remove(node)
+        stack = [node]
+        while stack:
+            cur = stack.pop()
+            del self._nodes[cur.iid]
+            stack.extend(cur.children)
+        self.tree.delete(node.iid)
 
     def _parse_initial(self, expr: str):
         expr = expr.strip()
@@ -580,27 +962,36 @@ class ConditionDialog(tk.Toplevel):
         def build(node, parent):
             if isinstance(node, ast.BoolOp):
                 op = "and" if isinstance(node.op, ast.And) else "or"
-                item = self.tree.insert(parent, tk.END, text=op.upper(), values=("op", op))
+                group = self._insert_node(parent, "op", op)
                 for v in node.values:
-                    build(v, item)
+                    build(v, group)
             else:
                 expr = ast.unparse(node) if hasattr(ast, "unparse") else ""
-                self.tree.insert(parent, tk.END, text=expr, values=("cond", expr))
-        build(tree.body, self.root_item)
+                self._insert_node(parent, "cond", expr)
+        build(tree.body, self.root_node)
 
     def _expr_from_item(self, item: str) -> str:
-        kind = self.tree.set(item, "kind")
-        expr = self.tree.set(item, "expr")
-        if kind == "cond":
-            return expr
-        children = self.tree.get_children(item)
-        parts = [self._expr_from_item(c) for c in children]
-        if not parts:
-            return "1" if expr == "and" else "0"
-        sep = f" {expr} "
-        if len(parts) == 1:
-            return parts[0]
-        return "(" + sep.join(parts) + ")"
+        # 모델의 전위 순서를 거꾸로 돌며 자식부터 식을 만든다 (Tk에는 묻지 않는다).
+        order: List[CondNode] = []
+        stack = [self._nodes[item]]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node.children)
+
+        built: Dict[int, str] = {}
+        for node in reversed(order):
+            if node.kind == "cond":
+                built[id(node)] = node.expr
+                continue
+            parts = [built[id(c)] for c in node.children]
+            if not parts:
+                built[id(node)] = "1" if node.expr == "and" else "0"
+            elif len(parts) == 1:
+                built[id(node)] = parts[0]
+            else:
+                built[id(node)] = "(" + f" {node.expr} ".join(parts) + ")"
+        return built[id(order[0])]
 
     def _ok(self):
         self.condition_str = self._expr_from_item(self.root_item)
@@ -628,7 +1019,7 @@ class ChoiceEditor(tk.Toplevel):
         ttk.Label(frm, text=tr("button_text")).grid(row=0, column=0, sticky="w")
         self.ent_text = tk.Text(frm, width=50, height=1, wrap="none")
         self.ent_text.grid(row=1, column=0, sticky="ew", pady=(0,8))
-        self.ent_text.bind("<KeyRelease>", lambda e: highlight_variables(self.ent_text, lambda: self.variables))
+        self.ent_text.bind("<KeyRelease>", lambda e: highlight_variables_if_changed(self.ent_text, lambda: self.variables))
         highlight_variables(self.ent_text, lambda: self.variables)
         if hasattr(master, "register_var_drop_target"):
             master.register_var_drop_target(self.ent_text)
@@ -695,8 +1086,7 @@ class ChoiceEditor(tk.Toplevel):
         text = self.ent_text.get("1.0", "end-1c").strip()
         target = self.cmb_target.get().strip()
         cond = self.ent_cond.get().strip()
-        cond = re.sub(r"\btrue\b", "1", cond, flags=re.IGNORECASE)
-        cond = re.sub(r"\bfalse\b", "0", cond, flags=re.IGNORECASE)
+        cond = normalize_condition(cond)
         if not text:
             messagebox.showerror(tr("error"), tr("input_button_text"))
             return
@@ -729,17 +1119,6 @@ class ChoiceEditor(tk.Toplevel):
             self.choice_actions = dlg.actions
 
     def _format_action(self, act: Action) -> str:
-        op_map = {
-            "set": "=",
-            "add": "+=",
-            "sub": "-=",
-            "mul": "*=",
-            "div": "/=",
-            "floordiv": "//=",
-            "mod": "%=",
-            "pow": "**=",
-            "expr": "=",
-        }
         val = act.value
         if isinstance(val, bool):
             v = str(val).lower()
@@ -747,7 +1126,7 @@ class ChoiceEditor(tk.Toplevel):
             v = val
         else:
             v = str(val)
-        return f"{act.var} {op_map.get(act.op, '=')} {v}"
+        return f"{act.var} {ACTION_OP_SYMBOLS.get(act.op, '=')} {v}"
 
 class ChapterEditor(tk.Tk):
     def __init__(self):
@@ -765,6 +1144,7 @@ class ChapterEditor(tk.Tk):
                 pass
 
         self.title("Branching Novel Editor")
+        self._window_title = "Branching Novel Editor"
         self.geometry("1200x800")
         self.minsize(1000, 700)
 
@@ -785,11 +1165,74 @@ class ChapterEditor(tk.Tk):
         self.dirty: bool = False
         self.code_modified: bool = False
         self._drag_var_name: Optional[str] = None
+        # 드래그 중 변수 이름을 보여 주는 창 (처음 드래그할 때 만들고 숨겼다가 다시 쓴다)
         self._drag_label: Optional[tk.Toplevel] = None
+        self._drag_label_text: Optional[ttk.Label] = None
         self._var_drop_targets: set[tk.Widget] = set()
+        # 드래그 시작 때 잰 놓기 대상의 화면 영역: (위젯, x, y, 너비, 높이)
+        self._drag_targets: List[Tuple[tk.Widget, int, int, int, int]] = []
+        self._drag_hover: Optional[tk.Widget] = None
+        self._drag_last_motion: int = 0
         self._code_updating: bool = False
-
-        self.undo_manager = UndoManager(self._capture_state, self._restore_state)
+        # 코드 편집기에 마지막으로 반영된(직렬화/파싱된) 텍스트
+        self._code_synced_text: Optional[str] = None
+        # _code_synced_text를 만든 직렬화 결과 (파싱/열기로 채워졌으면 None)
+        self._code_serialized: Optional[str] = None
+        # 시작 분기 콤보박스에 마지막으로 넣은 목록
+        self._last_start_values: Tuple[str, ...] = ()
+        self._ui_refresh_job: Optional[str] = None
+        self._code_update_job: Optional[str] = None
+        # 코드 편집기 입력 후 파싱을 시작할 예약 작업과 진행 중인 파싱: (번호, 텍스트, Future)
+        self._code_parse_job: Optional[str] = None
+        self._code_parse: Optional[Tuple[int, str, Future]] = None
+        self._code_parse_seq: int = 0
+        # 파싱·파일 쓰기처럼 위젯을 건드리지 않는 작업을 Tk 스레드 밖에서 돌리는 작업자
+        self._worker_pool: Optional[ThreadPoolExecutor] = None
+        # 작업자 결과를 기다리며 예약해 둔 확인 작업 (종료할 때 취소한다)
+        self._worker_polls: Set[str] = set()
+        # 본문/제목 입력이 잠시 멈추면 모델 반영/undo 기록을 한 번에 하는 예약 작업
+        self._edit_commit_job: Optional[str] = None
+        # 본문 칸에 지금 불러와 있는 분기 (예약된 반영이 다른 분기에 쓰이지 않도록)
+        self._body_branch: Optional[Branch] = None
+        # 작품 제목 칸에 마지막으로 반영한 텍스트 (키를 놓을 때마다 같은지 비교)
+        self._title_text: str = ""
+        # 코드 편집기 탭이 가려져 있어 갱신을 미뤘는지 여부
+        self._code_stale: bool = False
+        self._meta_refresh_job: Optional[str] = None
+        # 하단 상태 메시지를 지우는 예약 작업
+        self._status_clear_job: Optional[str] = None
+        # 변수 추가/편집 창 (처음 쓸 때 만들고 숨겼다가 다시 쓴다)
+        self._var_dlg: Optional[VariableDialog] = None
+        # 검사/루프 분석 결과 창 (닫으면 숨겨 두었다가 다음 결과에 다시 쓴다)
+        self._val_win: Optional[Tuple[tk.Toplevel, tk.Text]] = None
+        self._loop_win: Optional[Tuple[tk.Toplevel, tk.Text]] = None
+        # 목록 순서와 위치 색인: 행 번호 <-> id (분기는 현재 챕터 기준)
+        self._chapter_order: List[str] = []
+        self._chapter_index: Dict[str, int] = {}
+        self._branch_order: List[str] = []
+        self._branch_index: Dict[str, int] = {}
+        self._branch_index_chapter: Optional[str] = None
+        # Listbox에 현재 표시 중인 행 문자열
+        self._last_chapter_rows: List[str] = []
+        self._last_branch_rows: List[str] = []
+        # _collect_variables 결과 캐시 (변수/스토리 교체 시 무효화)
+        self._vars_cache: Optional[List[str]] = None
+        self._vars_cache_story: Optional[Story] = None
+        # 같은 캐시의 frozenset 판: 강조 함수가 키 입력마다 집합을 새로 만들지 않게 그대로 넘긴다.
+        self._vars_frozen: frozenset = frozenset()
+        # 변수 목록 Treeview에 표시 중인 행: 이름 -> 값 문자열 / Treeview iid
+        self._var_rows: Dict[str, str] = {}
+        self._vars_row_iids: Dict[str, str] = {}
+        # 본문 하이라이트가 마지막으로 반영한 텍스트/변수 목록
+        self._body_hl_text: Optional[str] = None
+        self._body_hl_vars: frozenset = frozenset()
+        # 챕터/분기를 연 뒤 유휴 시간에 돌릴 제목·본문 전체 하이라이트 작업
+        self._form_hl_job: Optional[str] = None
+        # 마지막으로 모델에 반영한 본문: (분기, raw_text, paragraphs)
+        self._body_applied: Optional[Tuple[Branch, str, List[str]]] = None
+        self._rebuild_order_index()
+
+        self.undo_manager = UndoManager(self._capture_state, self._restore_state, copy_state=False)
 
         self._build_menu()
         self._build_ui()
@@ -802,6 +1245,10 @@ class ChapterEditor(tk.Tk):
         # 찾기/변경 상태
         self.find_results: List[Tuple[str, int]] = []
         self.find_index: int = -1
+        self._find_text_cache: Dict[str, Tuple[List[str], str]] = {}
+        # 검색어별 분기 적중 위치: bid -> (paragraphs 리스트, 오프셋 목록)
+        self._find_hits: Dict[str, Tuple[List[str], List[int]]] = {}
+        self._find_hits_query: str = ""
         self._last_find_text: str = ""
         self._last_find_scope: str = "branch"
 
@@ -809,16 +1256,14 @@ class ChapterEditor(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self._exit_app)
 
     def _capture_state(self):
-        return {
-            "story": copy.deepcopy(self.story),
-            "current_chapter_id": self.current_chapter_id,
-            "current_branch_id": self.current_branch_id,
-        }
-
-    def _restore_state(self, state: Dict[str, Any]):
-        self.story = copy.deepcopy(state["story"])
-        self.current_chapter_id = state["current_chapter_id"]
-        self.current_branch_id = state["current_branch_id"]
+        # 바뀐 분기만 다시 피클하는 불변 스냅샷이라 UndoManager가 따로 복사하지 않는다.
+        return (self.story.snapshot(), self.current_chapter_id, self.current_branch_id)
+
+    def _restore_state(self, state: Tuple[tuple, Optional[str], Optional[str]]):
+        snap, self.current_chapter_id, self.current_branch_id = state
+        self.story = Story.from_snapshot(snap)
+        self._clear_find_caches()
+        self._rebuild_order_index()
         self._refresh_chapter_list()
         if self.current_chapter_id:
             self._load_chapter_to_form(self.current_chapter_id)
@@ -838,8 +1283,8 @@ class ChapterEditor(tk.Tk):
         m.add_cascade(label=tr("file_menu"), menu=fm)
 
         em = tk.Menu(m, tearoff=0)
-        em.add_command(label=tr("undo"), command=self.undo_manager.undo, accelerator="Ctrl+Z")
-        em.add_command(label=tr("redo"), command=self.undo_manager.redo, accelerator="Ctrl+Y")
+        em.add_command(label=tr("undo"), command=self._undo, accelerator="Ctrl+Z")
+        em.add_command(label=tr("redo"), command=self._redo, accelerator="Ctrl+Y")
         em.add_separator()
         em.add_command(label=tr("add_chapter"), command=self._add_chapter, accelerator="Ctrl+Shift+A")
         em.add_command(label=tr("delete_chapter"), command=self._delete_current_chapter, accelerator="Del")
@@ -860,19 +1305,76 @@ class ChapterEditor(tk.Tk):
         self.bind_all("<Delete>", lambda e: self._delete_current_chapter())
         self.bind_all("<Control-Shift-A>", lambda e: self._add_chapter())
         self.bind_all("<Control-f>", lambda e: self._open_find_window())
-        self.bind_all("<Control-z>", lambda e: self.undo_manager.undo())
-        self.bind_all("<Control-y>", lambda e: self.undo_manager.redo())
+        self.bind_all("<Control-z>", lambda e: self._undo())
+        self.bind_all("<Control-y>", lambda e: self._redo())
+
+    def _undo(self) -> None:
+        # 아직 기록되지 않은 입력이 있으면 먼저 기록해 그 입력부터 되돌린다.
+        self._commit_pending_edit()
+        self.undo_manager.undo()
+
+    def _redo(self) -> None:
+        self._commit_pending_edit()
+        self.undo_manager.redo()
 
     def _change_language(self, lang: str) -> None:
         set_language(lang)
         lang_file = get_user_lang_file("editor_language.txt")
+        # 느린 디스크에서도 창이 멈추지 않도록 파일은 작업자 스레드에서 쓴다.
+        self._when_done(self._worker().submit(write_text_atomic, lang_file, lang), self._on_language_saved)
+        messagebox.showinfo("Language / 언어", tr("language_change_restart"))
+
+    def _on_language_saved(self, future: Future) -> None:
+        if future.cancelled():
+            return
         try:
-            with open(lang_file, "w", encoding="utf-8") as f:
-                f.write(lang)
-            messagebox.showinfo("Language / 언어", tr("language_change_restart"))
-        except OSError as e:
+            future.result()
+        except Exception as e:
             messagebox.showerror(tr("error"), str(e))
 
+    def _worker(self) -> ThreadPoolExecutor:
+        """Return the single background worker, starting it on first use.
+
+        Jobs must not touch Tk; hand results back with ``_when_done``.
+        """
+        if self._worker_pool is None:
+            self._worker_pool = ThreadPoolExecutor(max_workers=1)
+        return self._worker_pool
+
+    def _when_done(self, future: Future, callback: Callable[[Future], None]) -> None:
+        """Call ``callback(future)`` on the Tk thread once ``future`` has finished.
+
+        Tk may only be called from the thread running the event loop, so the
+        future is polled from there instead of the worker scheduling ``after``.
+        """
+        if future.done():
+            callback(future)
+        else:
+            self._schedule_worker_poll(self._when_done, future, callback)
+
+    def _schedule_worker_poll(self, func: Callable[..., None], *args: Any) -> None:
+        """Run ``func(*args)`` after ``WORKER_POLL_MS``; ``_shutdown_worker`` cancels it."""
+        job = ""
+
+        def run() -> None:
+            self._worker_polls.discard(job)
+            func(*args)
+
+        job = self.after(WORKER_POLL_MS, run)
+        self._worker_polls.add(job)
+
+    def _shutdown_worker(self) -> None:
+        """Stop polling and cancel the code parse before the window goes away."""
+        self._cancel_code_parse()
+        for job in self._worker_polls:
+            self.after_cancel(job)
+        self._worker_polls.clear()
+        if self._worker_pool is not None:
+            # 파싱만 위에서 취소하고, 대기 중인 설정 파일 쓰기 등은 끝까지 돌게 둔다.
+            # 기다리지는 않는다: 인터프리터가 끝날 때 작업자 스레드를 마저 기다려 준다.
+            self._worker_pool.shutdown(wait=False)
+            self._worker_pool = None
+
     def _build_ui(self):
         # 좌: 메타 + 챕터 리스트, 우: 챕터 편집 + 선택지 + 코드 편집기
         root = ttk.Frame(self, padding=8)
@@ -895,6 +1397,7 @@ class ChapterEditor(tk.Tk):
         self.ent_title = tk.Text(meta, width=30, height=1, wrap="none")
         self.ent_title.grid(row=0, column=1, sticky="ew", pady=(0, 6))
         self.ent_title.insert("1.0", self.story.title)
+        self._title_text = self.story.title
         self.ent_title.bind("<KeyRelease>", lambda e: self._on_title_changed())
 
         ttk.Label(meta, text=tr("start_branch_label")).grid(row=1, column=0, sticky="w")
@@ -903,10 +1406,11 @@ class ChapterEditor(tk.Tk):
         self.cmb_start.bind("<<ComboboxSelected>>", lambda e: self._on_start_changed())
 
         ttk.Label(meta, text=tr("ending_text_label")).grid(row=2, column=0, sticky="w")
-        self.ent_end = ttk.Entry(meta, width=30)
+        # 키 입력이 아니라 실제 내용이 바뀔 때만(변수 끌어놓기 포함) 반영한다.
+        self.var_end = tk.StringVar(value=self.story.ending_text)
+        self.ent_end = ttk.Entry(meta, width=30, textvariable=self.var_end)
         self.ent_end.grid(row=2, column=1, sticky="ew")
-        self.ent_end.insert(0, self.story.ending_text)
-        self.ent_end.bind("<KeyRelease>", lambda e: self._on_ending_changed())
+        self.var_end.trace_add("write", lambda *a: self._on_ending_changed())
         if hasattr(self, "register_var_drop_target"):
             self.register_var_drop_target(self.ent_end)
 
@@ -974,10 +1478,14 @@ class ChapterEditor(tk.Tk):
         ttk.Button(bbtns, text=tr("up"), command=lambda: self._reorder_branch(-1)).pack(side="left", padx=(6, 0))
         ttk.Button(bbtns, text=tr("down"), command=lambda: self._reorder_branch(1)).pack(side="left", padx=(6, 0))
 
+        # 변수 강조 칸들은 바인딩 태그 하나를 공유해 <KeyRelease> 콜백 하나로 처리한다.
+        self.bind_class(VAR_HIGHLIGHT_TAG, "<KeyRelease>", self._on_var_highlight_key)
+
         # 우측 편집/코드 편집기 영역
         right = ttk.Notebook(root)
         right.grid(row=0, column=1, sticky="nsew")
         self.nb_right = right
+        right.bind("<<NotebookTabChanged>>", self._on_right_tab_changed)
 
         # 챕터 편집 탭
         edit_tab = ttk.Frame(right, padding=8)
@@ -997,8 +1505,7 @@ class ChapterEditor(tk.Tk):
         self.ent_ch_title.grid(row=1, column=1, sticky="ew", pady=(0, 6))
         self.ent_ch_title.bind("<FocusOut>", lambda e: self._apply_chapter_id_title())
         self.ent_ch_title.bind("<Return>", lambda e: self._apply_chapter_id_title())
-        self.ent_ch_title.bind("<KeyRelease>", lambda e: highlight_variables(self.ent_ch_title, lambda: self._collect_variables()))
-        highlight_variables(self.ent_ch_title, lambda: self._collect_variables())
+        self._add_var_highlight_tag(self.ent_ch_title)
         self.register_var_drop_target(self.ent_ch_title)
 
         ttk.Label(edit_tab, text=tr("branch_id")).grid(row=2, column=0, sticky="w")
@@ -1012,8 +1519,7 @@ class ChapterEditor(tk.Tk):
         self.ent_br_title.grid(row=3, column=1, sticky="ew", pady=(0, 6))
         self.ent_br_title.bind("<FocusOut>", lambda e: self._apply_branch_id_title())
         self.ent_br_title.bind("<Return>", lambda e: self._apply_branch_id_title())
-        self.ent_br_title.bind("<KeyRelease>", lambda e: highlight_variables(self.ent_br_title, lambda: self._collect_variables()))
-        highlight_variables(self.ent_br_title, lambda: self._collect_variables())
+        self._add_var_highlight_tag(self.ent_br_title)
         self.register_var_drop_target(self.ent_br_title)
 
         # 본문
@@ -1029,8 +1535,8 @@ class ChapterEditor(tk.Tk):
         scr = ttk.Scrollbar(body_frame, orient="vertical", command=self.txt_body.yview)
         scr.grid(row=0, column=1, sticky="ns")
         self.txt_body.configure(yscrollcommand=scr.set)
-        self.txt_body.bind("<KeyRelease>", lambda e: highlight_variables(self.txt_body, lambda: self._collect_variables()))
-        highlight_variables(self.txt_body, lambda: self._collect_variables())
+        # 처음 하이라이트는 첫 챕터를 불러올 때 유휴 작업으로 한다.
+        self._add_var_highlight_tag(self.txt_body)
         self.register_var_drop_target(self.txt_body)
         self.txt_body.bind("<<Modified>>", self._on_body_modified)
 
@@ -1057,6 +1563,7 @@ class ChapterEditor(tk.Tk):
         # 코드 편집기 탭
         code_tab = ttk.Frame(right, padding=8)
         right.add(code_tab, text=tr("code_editor_tab"))
+        self._code_tab = code_tab
         code_tab.rowconfigure(0, weight=1)
         code_tab.columnconfigure(0, weight=1)
 
@@ -1085,6 +1592,9 @@ class ChapterEditor(tk.Tk):
         left_btns = ttk.Frame(bottom)
         left_btns.pack(side="left")
         ttk.Button(left_btns, text=tr("validate_story"), command=self._validate_story).pack(side="left")
+        # 가운데: 저장 완료 등 잠깐 보여 주는 상태 메시지
+        self.lbl_status = ttk.Label(bottom, text="")
+        self.lbl_status.pack(side="left", padx=(12, 0))
         # 오른쪽: 저장/실행
         right_btns = ttk.Frame(bottom)
         right_btns.pack(side="right")
@@ -1093,6 +1603,17 @@ class ChapterEditor(tk.Tk):
 
         root.pack(fill="both", expand=True)
 
+    @staticmethod
+    def _add_var_highlight_tag(widget: tk.Text) -> None:
+        widget.bindtags(widget.bindtags() + (VAR_HIGHLIGHT_TAG,))
+
+    def _on_var_highlight_key(self, event) -> None:
+        if event.widget is self.txt_body:
+            # 본문은 바뀐 줄만 다시 칠한다.
+            self._highlight_body_changes()
+        else:
+            highlight_variables_if_changed(event.widget, self._variable_set)
+
     def register_var_drop_target(self, widget: tk.Widget) -> None:
         self._var_drop_targets.add(widget)
         widget.bind("<Destroy>", lambda e, w=widget: self._var_drop_targets.discard(w))
@@ -1102,33 +1623,73 @@ class ChapterEditor(tk.Tk):
         if not item:
             return
         self._drag_var_name = self.tree_vars.item(item, "values")[0]
+        # 드래그 중에는 창 배치가 바뀌지 않으므로 대상 영역을 한 번만 재 둔다.
+        targets = [
+            (w, w.winfo_rootx(), w.winfo_rooty(), w.winfo_width(), w.winfo_height())
+            for w in self._var_drop_targets
+            if w.winfo_ismapped()
+        ]
+        # 겹친 대화상자 중 가려진 쪽에 놓이지 않도록 위에 있는 창의 대상부터 검사한다.
+        # wm stackorder는 아래 창부터 위 창 순서로 하위 최상위 창까지 모두 돌려준다.
+        stack = {name: i for i, name in enumerate(self.tk.splitlist(self.tk.call("wm", "stackorder", self)))}
+        targets.sort(key=lambda t: stack.get(str(t[0].winfo_toplevel()), -1), reverse=True)
+        self._drag_targets = targets
+        self._drag_hover = None
+        self._drag_last_motion = event.time - DRAG_MOTION_INTERVAL_MS
         self.bind_all("<Motion>", self._on_var_drag_motion)
         self.bind_all("<ButtonRelease-1>", self._on_var_drag_release)
-        self._drag_label = tk.Toplevel(self)
-        self._drag_label.overrideredirect(True)
-        ttk.Label(self._drag_label, text=self._drag_var_name).pack()
+        if self._drag_label is None:
+            self._drag_label = tk.Toplevel(self)
+            self._drag_label.overrideredirect(True)
+            self._drag_label_text = ttk.Label(self._drag_label)
+            self._drag_label_text.pack()
+        self._drag_label_text.configure(text=self._drag_var_name)
         self._drag_label.geometry(f"+{event.x_root+10}+{event.y_root+10}")
+        self._drag_label.deiconify()
+
+    def _drop_target_at(self, x_root: int, y_root: int) -> Optional[Tuple[tk.Widget, int, int]]:
+        """Return the drop target under a screen point and the point in its coordinates.
+
+        ``_drag_targets`` is sorted topmost window first, so where dialogs
+        overlap the visible one wins. A hit is rejected when the window under
+        the pointer is not the target's own window, e.g. the Find window
+        lying over the body.
+        """
+        for widget, wx, wy, width, height in self._drag_targets:
+            if wx <= x_root < wx + width and wy <= y_root < wy + height:
+                under = self.winfo_containing(x_root, y_root)
+                if under is None or str(under.winfo_toplevel()) != str(widget.winfo_toplevel()):
+                    return None
+                return widget, x_root - wx, y_root - wy
+        return None
 
     def _on_var_drag_motion(self, event):
         if not self._drag_var_name:
             return
+        # 마우스 이동 이벤트는 초당 수백 번 올 수 있어 일정 간격으로만 처리한다.
+        if 0 <= event.time - self._drag_last_motion < DRAG_MOTION_INTERVAL_MS:
+            return
+        self._drag_last_motion = event.time
         if self._drag_label:
             self._drag_label.geometry(f"+{event.x_root+10}+{event.y_root+10}")
-        widget = self.winfo_containing(event.x_root, event.y_root)
-        if widget in self._var_drop_targets:
-            x = event.x_root - widget.winfo_rootx()
-            y = event.y_root - widget.winfo_rooty()
-            if isinstance(widget, tk.Text):
-                idx = widget.index(f"@{x},{y}")
-                widget.mark_set("insert", idx)
-                widget.focus_force()
-            else:
-                try:
-                    idx = widget.index(f"@{x}")
-                except tk.TclError:
-                    idx = widget.index(tk.INSERT)
-                widget.icursor(idx)
-                widget.focus_force()
+        hit = self._drop_target_at(event.x_root, event.y_root)
+        if hit is None:
+            # 대상 밖으로 나갔다가 돌아오면 포커스를 다시 옮긴다.
+            self._drag_hover = None
+            return
+        widget, x, y = hit
+        if isinstance(widget, tk.Text):
+            widget.mark_set("insert", widget.index(f"@{x},{y}"))
+        else:
+            try:
+                idx = widget.index(f"@{x}")
+            except tk.TclError:
+                idx = widget.index(tk.INSERT)
+            widget.icursor(idx)
+        # 포커스는 다른 대상으로 넘어갈 때만 옮긴다.
+        if widget is not self._drag_hover:
+            widget.focus_force()
+            self._drag_hover = widget
 
     def _on_var_drag_release(self, event):
         if not self._drag_var_name:
@@ -1140,7 +1701,7 @@ class ChapterEditor(tk.Tk):
             if isinstance(widget, tk.Text):
                 idx = widget.index(f"@{x},{y}")
                 widget.insert(idx, f"__{self._drag_var_name}__")
-                highlight_variables(widget, lambda: self._collect_variables())
+                highlight_variables(widget, self._variable_set)
             else:
                 try:
                     idx = widget.index(f"@{x}")
@@ -1149,50 +1710,67 @@ class ChapterEditor(tk.Tk):
                 widget.insert(idx, f"__{self._drag_var_name}__")
             widget.focus_force()
         self._drag_var_name = None
-        if self._drag_label:
-            self._drag_label.destroy()
-            self._drag_label = None
+        self._drag_targets = []
+        self._drag_hover = None
+        if self._drag_label is not None:
+            self._drag_label.withdraw()
         self.unbind_all("<Motion>")
         self.unbind_all("<ButtonRelease-1>")
 
     # ---------- 핸들러 ----------
+    def _load_title_field(self) -> None:
+        self.ent_title.delete("1.0", tk.END)
+        self.ent_title.insert("1.0", self.story.title)
+        self._title_text = self.story.title
+
     def _on_title_changed(self):
         text = self.ent_title.get("1.0", "end-1c")
-        if VAR_PATTERN.search(text):
-            text = VAR_PATTERN.sub("", text)
+        if text == self._title_text:
+            # 방향키/수정키처럼 글자를 바꾸지 않는 키
+            return
+        # 제목에는 변수 자리표시자를 쓸 수 없으므로 지운다 (지운 게 있을 때만 위젯을 고친다).
+        text, removed = VAR_PATTERN.subn("", text)
+        if removed:
             self.ent_title.delete("1.0", tk.END)
             self.ent_title.insert("1.0", text)
+        self._title_text = text
         self.story.title = text.strip() or "Untitled"
         self._set_dirty(True)
-        self._update_code_editor()
-        self.undo_manager.record()
+        self._schedule_code_update()
+        self._schedule_edit_commit()
 
     def _on_start_changed(self):
+        self._commit_pending_edit()
         sid = self.cmb_start.get().strip()
         if sid:
             self.story.start_id = sid
             self._set_dirty(True)
-            self._update_code_editor()
+            self._schedule_code_update()
             self.undo_manager.record()
 
     def _on_ending_changed(self):
-        self.story.ending_text = self.ent_end.get().strip() or "The End"
+        text = self.var_end.get().strip() or "The End"
+        if text == self.story.ending_text:
+            # 공백만 바꾼 경우나 아래 _refresh_meta_panel이 되돌려 쓴 경우
+            return
+        self.story.ending_text = text
         self._set_dirty(True)
-        self._update_code_editor()
-        self.undo_manager.record()
+        self._schedule_code_update()
+        self._schedule_edit_commit()
 
     def _on_show_disabled_changed(self):
+        self._commit_pending_edit()
         self.story.show_disabled = self.var_show_disabled.get()
         self._set_dirty(True)
-        self._update_code_editor()
+        self._schedule_code_update()
         self.undo_manager.record()
 
     def _on_select_chapter(self):
         sel = self.lst_chapters.curselection()
         if not sel:
             return
-        idx = sel[0]
-        cid = list(self.story.chapters.keys())[idx]
+        # 목록 행 번호는 순서 색인으로 바로 id가 된다.
+        cid = self._chapter_order[sel[0]]
         if self.current_chapter_id != cid:
             self._apply_body_to_model()
             self._load_chapter_to_form(cid)
@@ -1201,21 +1779,111 @@ class ChapterEditor(tk.Tk):
         sel = self.lst_branches.curselection()
         if not sel or self.current_chapter_id is None:
             return
-        idx = sel[0]
-        ch = self.story.chapters[self.current_chapter_id]
-        bid = list(ch.branches.keys())[idx]
+        if self._branch_index_chapter != self.current_chapter_id:
+            self._rebuild_branch_index()
+        bid = self._branch_order[sel[0]]
         if self.current_branch_id != bid:
             self._apply_body_to_model()
             self._load_branch_to_form(bid)
 
+    def _schedule_form_highlight(self) -> None:
+        """Highlight the chapter/branch titles and the body once the event loop is idle.
+
+        Loading a chapter and then its first branch costs a single pass.
+        Until it runs, the body baseline is cleared so a keystroke makes
+        ``_highlight_body_changes`` highlight everything.
+        """
+        self._body_hl_text = None
+        if self._form_hl_job is None:
+            self._form_hl_job = self.after_idle(self._highlight_form)
+
+    def _highlight_form(self) -> None:
+        self._form_hl_job = None
+        highlight_variables(self.ent_ch_title, self._variable_set)
+        highlight_variables(self.ent_br_title, self._variable_set)
+        self._highlight_body()
+
+    def _highlight_body(self) -> None:
+        highlight_variables(self.txt_body, self._variable_set)
+        self._body_hl_text = self.txt_body.get("1.0", "end-1c")
+        self._body_hl_vars = self._variable_set()
+
+    def _highlight_body_changes(self) -> None:
+        """Re-highlight only the body lines changed since the last highlight.
+
+        Tk tags follow the text they are attached to, so lines outside the
+        changed block keep correct tags unless the set of variables changed
+        or the edit toggled a block comment (odd number of lone ``;`` lines).
+        """
+        text = self.txt_body.get("1.0", "end-1c")
+        old = self._body_hl_text
+        vars_set = self._variable_set()
+        if old is None or (vars_set is not self._body_hl_vars and vars_set != self._body_hl_vars):
+            self._highlight_body()
+            return
+        get_vars = self._variable_set
+        # 같은 글자로 덮어쓴 경우처럼 비교로 드러나지 않는 편집에 대비해
+        # 커서 줄(줄바꿈 입력이면 그 앞 줄까지)은 항상 다시 칠한다.
+        cursor_line = int(self.txt_body.index(tk.INSERT).split(".")[0])
+        cursor_first = max(1, cursor_line - 1)
+        if text == old:
+            highlight_variables_range(self.txt_body, get_vars, cursor_first, cursor_line)
+            return
+        old_lines = old.split("\n")
+        new_lines = text.split("\n")
+        head, tail = changed_line_span(old_lines, new_lines)
+        old_end = len(old_lines) - tail
+        new_end = len(new_lines) - tail
+        if block_comment_open("\n".join(old_lines[head:old_end])) != block_comment_open(
+            "\n".join(new_lines[head:new_end])
+        ):
+            self._highlight_body()
+            return
+        # 같은 줄이 반복되면 실제 편집 위치는 더 앞일 수 있으므로 그만큼 범위를 넓힌다.
+        start = head
+        while (
+            start > 0
+            and old_lines[start - 1] == old_lines[old_end - 1 - (head - start)]
+            and new_lines[start - 1] == new_lines[new_end - 1 - (head - start)]
+        ):
+            start -= 1
+        # 경계 줄바꿈의 태그도 다시 맞추도록 앞뒤로 한 줄씩 넓힌다.
+        first = max(1, start)
+        last = min(len(new_lines), new_end + 1)
+        highlight_variables_range(self.txt_body, get_vars, first, last)
+        if cursor_first < first or cursor_line > last:
+            highlight_variables_range(self.txt_body, get_vars, cursor_first, cursor_line)
+        self._body_hl_text = text
+
     def _on_body_modified(self, evt):
         # Text의 Modified 플래그를 수동 리셋
         if self.txt_body.edit_modified():
             self.txt_body.edit_modified(False)
             self._set_dirty(True)
+            self._schedule_edit_commit()
+
+    def _schedule_edit_commit(self) -> None:
+        """Apply the body and record undo once typing pauses for ``EDIT_COMMIT_DELAY_MS``.
+
+        Used for the fields that change on every keystroke: the body, the
+        story title and the ending text. Each keystroke pushes the pending
+        job back, so a burst of typing costs one paragraph split, one
+        serialization and one undo entry.
+        """
+        if self._edit_commit_job is not None:
+            self.after_cancel(self._edit_commit_job)
+        self._edit_commit_job = self.after(EDIT_COMMIT_DELAY_MS, self._commit_pending_edit)
+
+    def _commit_pending_edit(self) -> None:
+        if self._edit_commit_job is None:
+            return
+        self.after_cancel(self._edit_commit_job)
+        self._edit_commit_job = None
+        # 본문 칸의 분기가 그사이 지워졌거나 다른 분기로 바뀌었으면 그 본문은 어디에도 쓰지 않는다.
+        if self._body_branch is not None and self.story.branches.get(self.current_branch_id) is self._body_branch:
             self._apply_body_to_model()
-            self._update_code_editor()
-            self.undo_manager.record()
+        self._schedule_code_update()
+        self.undo_manager.record()
 
     def _on_code_modified(self, evt):
         if self.txt_code.edit_modified():
@@ -1223,31 +1891,89 @@ class ChapterEditor(tk.Tk):
             if not self._code_updating:
                 self.code_modified = True
                 self._set_dirty(True)
-                self.after(500, lambda: self._apply_code_to_model(silent=True))
+                if self._code_parse_job is not None:
+                    self.after_cancel(self._code_parse_job)
+                self._code_parse_job = self.after(CODE_PARSE_DELAY_MS, self._start_code_parse)
 
+    def _start_code_parse(self) -> None:
+        """Parse the code editor on a worker thread and apply the result when done.
+
+        Typing in a large story then never waits for the parser. Only the
+        newest parse is applied, and only if the text has not changed since
+        it started; later edits schedule their own parse.
+        """
+        self._code_parse_job = None
+        if not self.code_modified:
+            return
+        txt = self.txt_code.get("1.0", tk.END)
+        if txt[:-1] == self._code_synced_text:
+            self._apply_code_to_model(silent=True)
+            return
+        self._code_parse_seq += 1
+        seq = self._code_parse_seq
+        self._code_parse = (seq, txt, self._worker().submit(parse_editor_code, txt))
+        self._schedule_worker_poll(self._poll_code_parse, seq)
+
+    def _poll_code_parse(self, seq: int) -> None:
+        pending = self._code_parse
+        if pending is None or pending[0] != seq:
+            return
+        _, txt, future = pending
+        if not future.done():
+            self._schedule_worker_poll(self._poll_code_parse, seq)
+            return
+        self._code_parse = None
+        if future.cancelled() or not self.code_modified or self.txt_code.get("1.0", tk.END) != txt:
+            return
+        try:
+            story = future.result()
+        except ParseError:
+            # 입력 중인 코드는 잠시 문법이 틀릴 수 있으므로 조용히 넘긴다.
+            return
+        except Exception as e:
+            # 파서 자체의 오류는 결과를 말없이 버리지 않고 알린다.
+            messagebox.showerror(tr("error"), str(e))
+            return
+        self._commit_pending_edit()
+        self._install_code_story(story, txt)
+
+    def _cancel_code_parse(self) -> None:
+        if self._code_parse_job is not None:
+            self.after_cancel(self._code_parse_job)
+            self._code_parse_job = None
+        if self._code_parse is not None:
+            self._code_parse[2].cancel()
+            self._code_parse = None
 
     # ---------- 상호작용 ----------
     def _load_chapter_to_form(self, cid: str):
+        # 입력이 멈추기 전에 분기를 옮기면 예약된 본문 반영이 새 분기를 덮어쓰므로 먼저 반영한다.
+        self._commit_pending_edit()
         self.current_chapter_id = cid
         ch = self.story.chapters[cid]
         self.ent_ch_id.delete(0, tk.END)
         self.ent_ch_id.insert(0, ch.chapter_id)
         self.ent_ch_title.delete("1.0", tk.END)
         self.ent_ch_title.insert("1.0", ch.title)
-        highlight_variables(self.ent_ch_title, lambda: self._collect_variables())
+        self._schedule_form_highlight()
+        self._rebuild_branch_index()
+        first = self._branch_order[0] if self._branch_order else None
+        if first:
+            # 목록을 채우기 전에 정해 두어야 새로 여는 분기 행이 선택된다.
+            self.current_branch_id = first
         self._refresh_branch_list()
-        first = next(iter(ch.branches.keys()), None)
         if first:
             self._load_branch_to_form(first)
 
     def _load_branch_to_form(self, bid: str):
+        self._commit_pending_edit()
         self.current_branch_id = bid
         br = self.story.branches[bid]
+        self._body_branch = br
         self.ent_br_id.delete(0, tk.END)
         self.ent_br_id.insert(0, br.branch_id)
         self.ent_br_title.delete("1.0", tk.END)
         self.ent_br_title.insert("1.0", br.title)
-        highlight_variables(self.ent_br_title, lambda: self._collect_variables())
 
         self.txt_body.config(state="normal")
         self.txt_body.delete("1.0", tk.END)
@@ -1255,34 +1981,42 @@ class ChapterEditor(tk.Tk):
             self.txt_body.insert(tk.END, br.raw_text)
         elif br.paragraphs:
             self.txt_body.insert(tk.END, "\n\n".join(br.paragraphs))
-        highlight_variables(self.txt_body, lambda: self._collect_variables())
+        # 본문은 먼저 보여 주고 제목과 함께 유휴 시간에 칠한다.
+        self._schedule_form_highlight()
         self.txt_body.edit_modified(False)
 
-        for i in self.tree_choices.get_children():
-            self.tree_choices.delete(i)
-        for c in br.choices:
-            self.tree_choices.insert("", tk.END, values=(c.text, c.target_id))
+        self._sync_tree_rows(self.tree_choices, [(c.text, c.target_id) for c in br.choices])
 
-        self._refresh_meta_panel()
-        self._update_code_editor()
+        self._schedule_meta_refresh()
+        self._schedule_code_update()
 
     def _apply_body_to_model(self):
         if self.current_branch_id is None:
             return
         br = self.story.branches[self.current_branch_id]
-        raw = self.txt_body.get("1.0", tk.END).rstrip("\n")
+        raw = self.txt_body.get("1.0", "end-1c").rstrip("\n")
+        applied = self._body_applied
+        if (
+            applied is not None
+            and applied[0] is br
+            and br.raw_text is applied[1]
+            and br.paragraphs is applied[2]
+            and raw == applied[1]
+        ):
+            # 마지막 반영 이후 본문도 모델도 그대로면 다시 파싱/무효화하지 않는다.
+            return
         br.raw_text = raw
         lines = raw.splitlines()
         parser = StoryParser()
         # Remove comment lines and inline comments so they don't appear
         # when running the game.
         lines = parser._remove_comments(lines)
-        cleaned = "\n".join(lines)
-        paras = [p.strip() for p in cleaned.split("\n\n")]
-        paras = [p for p in paras if p != ""]
-        br.paragraphs = paras
+        br.paragraphs = split_paragraphs("\n".join(lines))
+        self._body_applied = (br, raw, br.paragraphs)
+        self.story.mark_dirty(br.branch_id)
 
     def _apply_chapter_id_title(self):
+        self._commit_pending_edit()
         if self.current_chapter_id is None:
             return
         new_id = self.ent_ch_id.get().strip()
@@ -1292,6 +2026,9 @@ class ChapterEditor(tk.Tk):
             self.ent_ch_id.focus_set()
             return
         cur_id = self.current_chapter_id
+        if new_id == cur_id and new_title == self.story.chapters[cur_id].title:
+            # 바뀐 것 없이 포커스만 옮긴 경우
+            return
         if new_id != cur_id:
             if new_id in self.story.chapters:
                 messagebox.showerror(tr("error"), tr("chapter_id_exists", id=new_id))
@@ -1301,16 +2038,25 @@ class ChapterEditor(tk.Tk):
             ch_obj = self.story.chapters.pop(cur_id)
             ch_obj.chapter_id = new_id
             self.story.chapters[new_id] = ch_obj
+            self._order_remove(self._chapter_order, self._chapter_index, cur_id)
+            self._order_append(self._chapter_order, self._chapter_index, new_id)
             for br in ch_obj.branches.values():
                 br.chapter_id = new_id
             self.current_chapter_id = new_id
-        self.story.chapters[new_id].title = new_title
-        self._refresh_chapter_list()
+            self.story.chapters[new_id].title = new_title
+            self._refresh_chapter_list()
+        else:
+            # 제목만 바뀌면 순서가 그대로이므로 해당 행 하나만 고친다.
+            self.story.chapters[new_id].title = new_title
+            self._refresh_list_row(
+                self.lst_chapters, self._last_chapter_rows, self._chapter_index[new_id], f"{new_id}  |  {new_title}"
+            )
         self._set_dirty(True)
-        self._update_code_editor()
+        self._schedule_code_update()
         self.undo_manager.record()
 
     def _apply_branch_id_title(self):
+        self._commit_pending_edit()
         if self.current_branch_id is None:
             return
         new_id = self.ent_br_id.get().strip()
@@ -1320,6 +2066,8 @@ class ChapterEditor(tk.Tk):
             self.ent_br_id.focus_set()
             return
         cur_id = self.current_branch_id
+        if new_id == cur_id and new_title == self.story.branches[cur_id].title:
+            return
         if new_id != cur_id:
             if new_id in self.story.branches:
                 messagebox.showerror(tr("error"), tr("branch_id_exists", id=new_id))
@@ -1328,68 +2076,183 @@ class ChapterEditor(tk.Tk):
                 return
             br_obj = self.story.branches.pop(cur_id)
             br_obj.branch_id = new_id
+            self._drop_find_cache(cur_id)
             self.story.branches[new_id] = br_obj
             ch = self.story.chapters[br_obj.chapter_id]
             ch.branches.pop(cur_id)
             ch.branches[new_id] = br_obj
-            for other in self.story.branches.values():
-                for c in other.choices:
-                    if c.target_id == cur_id:
-                        c.target_id = new_id
+            self._order_remove(self._branch_order, self._branch_index, cur_id)
+            self._order_append(self._branch_order, self._branch_index, new_id)
+            self.story.retarget_choices(cur_id, new_id)
+            # 선택지 목록에 표시된 대상 id도 맞춘다.
+            for iid, c in zip(self.tree_choices.get_children(), br_obj.choices):
+                if c.target_id == new_id:
+                    self.tree_choices.item(iid, values=(c.text, c.target_id))
             if self.story.start_id == cur_id:
                 self.story.start_id = new_id
             self.current_branch_id = new_id
-        self.story.branches[new_id].title = new_title
-        self._refresh_branch_list()
-        self._refresh_meta_panel()
+            self.story.branches[new_id].title = new_title
+            self.story.mark_dirty(cur_id, new_id)
+            self._refresh_branch_list()
+            self._schedule_meta_refresh()
+        else:
+            self.story.branches[new_id].title = new_title
+            self.story.mark_dirty(new_id)
+            if self._branch_index_chapter != self.current_chapter_id:
+                self._rebuild_branch_index()
+            self._refresh_list_row(
+                self.lst_branches, self._last_branch_rows, self._branch_index[new_id], f"{new_id}  |  {new_title}"
+            )
         self._set_dirty(True)
-        self._update_code_editor()
+        self._schedule_code_update()
         self.undo_manager.record()
 
+    def _rebuild_order_index(self) -> None:
+        self._chapter_order = list(self.story.chapters)
+        self._chapter_index = {cid: i for i, cid in enumerate(self._chapter_order)}
+        self._rebuild_branch_index()
+
+    def _rebuild_branch_index(self) -> None:
+        ch = self.story.chapters.get(self.current_chapter_id) if self.current_chapter_id else None
+        self._branch_order = list(ch.branches) if ch else []
+        self._branch_index = {bid: i for i, bid in enumerate(self._branch_order)}
+        self._branch_index_chapter = self.current_chapter_id
+
+    @staticmethod
+    def _order_append(order: List[str], index: Dict[str, int], key: str) -> None:
+        index[key] = len(order)
+        order.append(key)
+
+    @staticmethod
+    def _order_remove(order: List[str], index: Dict[str, int], key: str) -> None:
+        pos = index.pop(key, None)
+        if pos is None:
+            return
+        del order[pos]
+        for i in range(pos, len(order)):
+            index[order[i]] = i
+
+    @staticmethod
+    def _sync_listbox(lst: tk.Listbox, old_rows: List[str], new_rows: List[str]) -> None:
+        """Splice only the rows of ``lst`` that differ between ``old_rows`` and ``new_rows``."""
+        limit = min(len(old_rows), len(new_rows))
+        head = 0
+        while head < limit and old_rows[head] == new_rows[head]:
+            head += 1
+        tail = 0
+        limit -= head
+        while tail < limit and old_rows[-1 - tail] == new_rows[-1 - tail]:
+            tail += 1
+        old_end = len(old_rows) - tail
+        new_end = len(new_rows) - tail
+        if old_end > head:
+            lst.delete(head, old_end - 1)
+        if new_end > head:
+            lst.insert(head, *new_rows[head:new_end])
+
+    @staticmethod
+    def _sync_tree_rows(tree: ttk.Treeview, rows: List[Tuple[str, ...]]) -> None:
+        """Show ``rows`` as the top-level items of ``tree``, reusing existing items.
+
+        Rows already present are relabelled in place and the surplus goes in a
+        single ``delete`` call, so switching branches does not tear down and
+        rebuild every row. The selection is cleared as a full rebuild would.
+        """
+        items = tree.get_children()
+        sel = tree.selection()
+        if sel:
+            tree.selection_remove(*sel)
+        for iid, values in zip(items, rows):
+            tree.item(iid, values=values)
+        if len(items) > len(rows):
+            tree.delete(*items[len(rows):])
+        for values in rows[len(items):]:
+            tree.insert("", tk.END, values=values)
+
+    @staticmethod
+    def _swap_listbox_rows(lst: tk.Listbox, rows: List[str], first: int) -> None:
+        """Swap rows ``first`` and ``first + 1`` of ``lst`` and of its mirror ``rows``."""
+        rows[first], rows[first + 1] = rows[first + 1], rows[first]
+        lst.delete(first, first + 1)
+        lst.insert(first, rows[first], rows[first + 1])
+
+    @classmethod
+    def _refresh_list_row(cls, lst: tk.Listbox, rows: List[str], idx: int, row: str) -> None:
+        """Replace row ``idx`` of ``lst`` if its text changed and keep it selected."""
+        if rows[idx] != row:
+            lst.delete(idx)
+            lst.insert(idx, row)
+            rows[idx] = row
+        cls._select_listbox_row(lst, idx)
+
+    @staticmethod
+    def _select_listbox_row(lst: tk.Listbox, idx: Optional[int]) -> None:
+        if idx is None:
+            lst.selection_clear(0, tk.END)
+            return
+        if lst.curselection() != (idx,):
+            lst.selection_clear(0, tk.END)
+            lst.selection_set(idx)
+        lst.see(idx)
+
     def _refresh_chapter_list(self):
-        self.lst_chapters.delete(0, tk.END)
-        for cid, ch in self.story.chapters.items():
-            self.lst_chapters.insert(tk.END, f"{cid}  |  {ch.title}")
+        chapters = self.story.chapters
+        rows = [f"{cid}  |  {chapters[cid].title}" for cid in self._chapter_order]
+        self._sync_listbox(self.lst_chapters, self._last_chapter_rows, rows)
+        self._last_chapter_rows = rows
+        idx = None
         if self.current_chapter_id and self.current_chapter_id in self.story.chapters:
-            idx = list(self.story.chapters.keys()).index(self.current_chapter_id)
-            self.lst_chapters.selection_clear(0, tk.END)
-            self.lst_chapters.selection_set(idx)
-            self.lst_chapters.see(idx)
+            idx = self._chapter_index[self.current_chapter_id]
+        self._select_listbox_row(self.lst_chapters, idx)
         self._refresh_branch_list()
-        self._refresh_meta_panel()
+        self._schedule_meta_refresh()
 
     def _refresh_branch_list(self):
-        self.lst_branches.delete(0, tk.END)
         if self.current_chapter_id is None:
+            self._sync_listbox(self.lst_branches, self._last_branch_rows, [])
+            self._last_branch_rows = []
             return
         ch = self.story.chapters[self.current_chapter_id]
-        for bid, br in ch.branches.items():
-            self.lst_branches.insert(tk.END, f"{bid}  |  {br.title}")
+        if self._branch_index_chapter != self.current_chapter_id:
+            self._rebuild_branch_index()
+        rows = [f"{bid}  |  {ch.branches[bid].title}" for bid in self._branch_order]
+        self._sync_listbox(self.lst_branches, self._last_branch_rows, rows)
+        self._last_branch_rows = rows
+        idx = None
         if self.current_branch_id and self.current_branch_id in ch.branches:
-            idx = list(ch.branches.keys()).index(self.current_branch_id)
-            self.lst_branches.selection_clear(0, tk.END)
-            self.lst_branches.selection_set(idx)
-            self.lst_branches.see(idx)
+            idx = self._branch_index[self.current_branch_id]
+        self._select_listbox_row(self.lst_branches, idx)
 
     def _refresh_meta_panel(self):
-        ids = list(self.story.branches.keys())
-        self.cmb_start["values"] = ids
-        if self.story.start_id in ids:
-            self.cmb_start.set(self.story.start_id)
-        elif ids:
-            self.cmb_start.set(ids[0])
-            self.story.start_id = ids[0]
-        self.ent_end.delete(0, tk.END)
-        self.ent_end.insert(0, self.story.ending_text)
-        self.var_show_disabled.set(self.story.show_disabled)
+        if self._meta_refresh_job is not None:
+            self.after_cancel(self._meta_refresh_job)
+            self._meta_refresh_job = None
+        # 값이 그대로인 위젯은 건드리지 않아 불필요한 Tk 이벤트/다시 그리기를 줄인다.
+        ids = tuple(self.story.branches)
+        if ids != self._last_start_values:
+            self.cmb_start["values"] = ids
+            self._last_start_values = ids
+        start = self.story.start_id
+        if start not in self.story.branches and ids:
+            start = ids[0]
+            self.story.start_id = start
+        if start in self.story.branches and self.cmb_start.get() != start:
+            self.cmb_start.set(start)
+        if self.var_end.get() != self.story.ending_text:
+            # 한 번에 써야 중간의 빈 값이 _on_ending_changed로 가지 않는다.
+            self.var_end.set(self.story.ending_text)
+        if self.var_show_disabled.get() != self.story.show_disabled:
+            self.var_show_disabled.set(self.story.show_disabled)
         self._refresh_variable_list()
 
     def _add_chapter(self):
+        self._commit_pending_edit()
         # 현재 변경사항 반영
         self._apply_body_to_model()
         new_cid = self.story.ensure_unique_chapter_id("chapter")
         chapter = Chapter(chapter_id=new_cid, title="New Chapter")
         self.story.chapters[new_cid] = chapter
+        self._order_append(self._chapter_order, self._chapter_index, new_cid)
         new_bid = self.story.ensure_unique_branch_id("branch")
         branch = Branch(branch_id=new_bid, title="New Branch", chapter_id=new_cid)
         chapter.branches[new_bid] = branch
@@ -1402,6 +2265,7 @@ class ChapterEditor(tk.Tk):
         self.undo_manager.record()
 
     def _delete_current_chapter(self):
+        self._commit_pending_edit()
         if self.current_chapter_id is None:
             return
         if len(self.story.chapters) <= 1:
@@ -1411,12 +2275,17 @@ class ChapterEditor(tk.Tk):
         ch = self.story.chapters[cid]
         if messagebox.askyesno(tr("confirm_delete"), tr("delete_chapter_prompt", id=cid)):
             for bid in list(ch.branches.keys()):
-                self.story.branches.pop(bid, None)
+                removed = self.story.branches.pop(bid, None)
+                if removed is not None:
+                    for c in removed.choices:
+                        self.story.unlink_choice(c)
+                self.story.mark_dirty(bid)
+                self._drop_find_cache(bid)
                 if self.story.start_id == bid:
                     self.story.start_id = None
             self.story.chapters.pop(cid)
-            keys = list(self.story.chapters.keys())
-            next_cid = keys[0] if keys else None
+            self._order_remove(self._chapter_order, self._chapter_index, cid)
+            next_cid = self._chapter_order[0] if self._chapter_order else None
             self.current_chapter_id = next_cid
             if next_cid:
                 next_bid = next(iter(self.story.chapters[next_cid].branches.keys()), None)
@@ -1432,24 +2301,30 @@ class ChapterEditor(tk.Tk):
             self.undo_manager.record()
 
     def _reorder_chapter(self, delta: int):
+        self._commit_pending_edit()
         if self.current_chapter_id is None:
             return
-        keys = list(self.story.chapters.keys())
-        idx = keys.index(self.current_chapter_id)
+        order = self._chapter_order
+        idx = self._chapter_index[self.current_chapter_id]
         new_idx = idx + delta
-        if new_idx < 0 or new_idx >= len(keys):
-            return
-        # dict 재구성으로 순서 변경
-        reordered = {}
-        keys[idx], keys[new_idx] = keys[new_idx], keys[idx]
-        for k in keys:
-            reordered[k] = self.story.chapters[k]
-        self.story.chapters = reordered
-        self._refresh_chapter_list()
+        if new_idx < 0 or new_idx >= len(order):
+            return
+        order[idx], order[new_idx] = order[new_idx], order[idx]
+        self._chapter_index[order[idx]] = idx
+        self._chapter_index[order[new_idx]] = new_idx
+        # dict는 바뀐 위치부터 뒤쪽만 다시 넣어 순서를 맞춘다.
+        chapters = self.story.chapters
+        for k in order[min(idx, new_idx):]:
+            chapters[k] = chapters.pop(k)
+        # 목록도 맞바뀐 두 행만 고친다 (분기 목록/메타 정보는 챕터 순서와 무관하다).
+        self._swap_listbox_rows(self.lst_chapters, self._last_chapter_rows, min(idx, new_idx))
+        self._select_listbox_row(self.lst_chapters, new_idx)
         self._set_dirty(True)
+        self._schedule_code_update()
         self.undo_manager.record()
 
     def _add_branch(self):
+        self._commit_pending_edit()
         if self.current_chapter_id is None:
             return
         self._apply_body_to_model()
@@ -1457,6 +2332,7 @@ class ChapterEditor(tk.Tk):
         br = Branch(branch_id=new_id, title="New Branch", chapter_id=self.current_chapter_id)
         self.story.branches[new_id] = br
         self.story.chapters[self.current_chapter_id].branches[new_id] = br
+        self._order_append(self._branch_order, self._branch_index, new_id)
         self.current_branch_id = new_id
         self._refresh_branch_list()
         self._load_branch_to_form(new_id)
@@ -1464,6 +2340,7 @@ class ChapterEditor(tk.Tk):
         self.undo_manager.record()
 
     def _delete_current_branch(self):
+        self._commit_pending_edit()
         if self.current_branch_id is None or self.current_chapter_id is None:
             return
         ch = self.story.chapters[self.current_chapter_id]
@@ -1473,10 +2350,16 @@ class ChapterEditor(tk.Tk):
         bid = self.current_branch_id
         if messagebox.askyesno(tr("confirm_delete"), tr("delete_branch_prompt", id=bid)):
             ch.branches.pop(bid, None)
-            self.story.branches.pop(bid, None)
+            removed = self.story.branches.pop(bid, None)
+            if removed is not None:
+                for c in removed.choices:
+                    self.story.unlink_choice(c)
+            self.story.mark_dirty(bid)
+            self._drop_find_cache(bid)
+            self._order_remove(self._branch_order, self._branch_index, bid)
             if self.story.start_id == bid:
                 self.story.start_id = next(iter(self.story.branches.keys()), None)
-            next_bid = next(iter(ch.branches.keys()))
+            next_bid = self._branch_order[0]
             self.current_branch_id = next_bid
             self._refresh_branch_list()
             self._load_branch_to_form(next_bid)
@@ -1484,86 +2367,162 @@ class ChapterEditor(tk.Tk):
             self.undo_manager.record()
 
     def _reorder_branch(self, delta: int):
+        self._commit_pending_edit()
         if self.current_branch_id is None or self.current_chapter_id is None:
             return
         ch = self.story.chapters[self.current_chapter_id]
-        keys = list(ch.branches.keys())
-        idx = keys.index(self.current_branch_id)
+        order = self._branch_order
+        idx = self._branch_index[self.current_branch_id]
         new_idx = idx + delta
-        if new_idx < 0 or new_idx >= len(keys):
+        if new_idx < 0 or new_idx >= len(order):
             return
-        reordered = {}
-        keys[idx], keys[new_idx] = keys[new_idx], keys[idx]
-        for k in keys:
-            reordered[k] = ch.branches[k]
-        ch.branches = reordered
-        self._refresh_branch_list()
+        order[idx], order[new_idx] = order[new_idx], order[idx]
+        self._branch_index[order[idx]] = idx
+        self._branch_index[order[new_idx]] = new_idx
+        branches = ch.branches
+        for k in order[min(idx, new_idx):]:
+            branches[k] = branches.pop(k)
+        self._swap_listbox_rows(self.lst_branches, self._last_branch_rows, min(idx, new_idx))
+        self._select_listbox_row(self.lst_branches, new_idx)
         self._set_dirty(True)
+        self._schedule_code_update()
         self.undo_manager.record()
 
+    def _refresh_vars_cache(self) -> None:
+        # 분기 액션은 코드 파싱으로만 바뀌고 그때는 스토리 객체가 새로 만들어진다.
+        if self._vars_cache is None or self._vars_cache_story is not self.story:
+            vars_set = set(self.story.variables.keys())
+            for br in self.story.branches.values():
+                for act in br.actions:
+                    vars_set.add(act.var)
+            self._vars_cache = sorted(vars_set)
+            self._vars_frozen = frozenset(vars_set)
+            self._vars_cache_story = self.story
+
+    def _invalidate_vars_cache(self) -> None:
+        """Drop the cached variable names after the variable table changed.
+
+        When the set of names actually changed, the title fields and the
+        body are retagged at the next idle point instead of on their next
+        keystroke.
+        """
+        old = self._vars_frozen
+        self._vars_cache = None
+        if self._variable_set() != old:
+            self._schedule_form_highlight()
+
     def _collect_variables(self) -> List[str]:
-        vars_set = set(self.story.variables.keys())
-        for br in self.story.branches.values():
-            for act in br.actions:
-                vars_set.add(act.var)
-        return sorted(vars_set)
+        self._refresh_vars_cache()
+        return list(self._vars_cache)
+
+    def _variable_set(self) -> frozenset:
+        """Return the cached variable names as a shared ``frozenset`` (do not mutate)."""
+        self._refresh_vars_cache()
+        return self._vars_frozen
+
+    @staticmethod
+    def _format_var_value(val: Union[int, float, bool, str]) -> str:
+        if isinstance(val, bool):
+            return str(val).lower()
+        if isinstance(val, str):
+            return repr(val)
+        return str(val)
 
     def _refresh_variable_list(self):
-        for i in self.tree_vars.get_children():
-            self.tree_vars.delete(i)
-        for name, val in self.story.variables.items():
-            if isinstance(val, bool):
-                val_str = str(val).lower()
-            elif isinstance(val, str):
-                val_str = repr(val)
-            else:
-                val_str = val
-            self.tree_vars.insert("", tk.END, values=(name, val_str))
+        rows = {name: self._format_var_value(val) for name, val in self.story.variables.items()}
+        if list(rows.items()) == list(self._var_rows.items()):
+            return
+        # 바뀐 행만 고친다. _vars_row_iids는 트리와 같은 순서를 유지한다.
+        iids = self._vars_row_iids
+        gone = [iids.pop(name) for name in [n for n in iids if n not in rows]]
+        if gone:
+            self.tree_vars.delete(*gone)
+        in_order = [name for name in rows if name in iids] == list(iids)
+        for idx, (name, val_str) in enumerate(rows.items()):
+            iid = iids.get(name)
+            if iid is None:
+                iids[name] = self.tree_vars.insert("", idx, values=(name, val_str))
+                continue
+            if self._var_rows.get(name) != val_str:
+                self.tree_vars.item(iid, values=(name, val_str))
+            if not in_order:
+                self.tree_vars.move(iid, "", idx)
+        self._vars_row_iids = {name: iids[name] for name in rows}
+        self._var_rows = rows
+
+    def _upsert_variable_row(self, name: str) -> None:
+        val_str = self._format_var_value(self.story.variables[name])
+        iid = self._vars_row_iids.get(name)
+        if iid is None:
+            self._vars_row_iids[name] = self.tree_vars.insert("", tk.END, values=(name, val_str))
+        elif self._var_rows.get(name) != val_str:
+            self.tree_vars.item(iid, values=(name, val_str))
+        self._var_rows[name] = val_str
+
+    def _remove_variable_row(self, name: str) -> None:
+        iid = self._vars_row_iids.pop(name, None)
+        if iid is not None:
+            self.tree_vars.delete(iid)
+        self._var_rows.pop(name, None)
+
+    def _variable_dialog(self) -> VariableDialog:
+        if self._var_dlg is None:
+            self._var_dlg = VariableDialog(self)
+        return self._var_dlg
 
     def _add_variable(self):
-        dlg = VariableDialog(self)
-        if dlg.result_ok:
+        self._commit_pending_edit()
+        dlg = self._variable_dialog()
+        if dlg.ask():
             if dlg.var_name in self.story.variables:
                 messagebox.showerror(tr("error"), tr("variable_name_exists"))
                 return
             self.story.variables[dlg.var_name] = dlg.value
-            self._refresh_variable_list()
+            self._invalidate_vars_cache()
+            self._upsert_variable_row(dlg.var_name)
             self._set_dirty(True)
-            self._update_code_editor()
+            self._schedule_code_update()
             self.undo_manager.record()
 
     def _edit_variable(self):
+        self._commit_pending_edit()
         sel = self.tree_vars.selection()
         if not sel:
             return
         name = self.tree_vars.item(sel[0], "values")[0]
         cur_val = self.story.variables.get(name)
-        dlg = VariableDialog(self, name, cur_val)
-        if dlg.result_ok:
+        dlg = self._variable_dialog()
+        if dlg.ask(name, cur_val):
             if dlg.var_name != name and dlg.var_name in self.story.variables:
                 messagebox.showerror(tr("error"), tr("variable_name_exists"))
                 return
             if dlg.var_name != name:
                 self.story.variables.pop(name, None)
+                # 이름이 바뀌면 dict 끝으로 가므로 행도 끝으로 옮긴다.
+                self._remove_variable_row(name)
             self.story.variables[dlg.var_name] = dlg.value
-            self._refresh_variable_list()
+            self._invalidate_vars_cache()
+            self._upsert_variable_row(dlg.var_name)
             self._set_dirty(True)
-            self._update_code_editor()
+            self._schedule_code_update()
             self.undo_manager.record()
 
     def _delete_variable(self):
+        self._commit_pending_edit()
         sel = self.tree_vars.selection()
         if not sel:
             return
         name = self.tree_vars.item(sel[0], "values")[0]
         if messagebox.askyesno(tr("confirm_delete"), tr("delete_variable_prompt", name=name)):
             self.story.variables.pop(name, None)
-            self._refresh_variable_list()
+            self._invalidate_vars_cache()
+            self._remove_variable_row(name)
             self._set_dirty(True)
-            self._update_code_editor()
+            self._schedule_code_update()
             self.undo_manager.record()
 
     def _add_choice(self):
+        self._commit_pending_edit()
         if self.current_branch_id is None:
             return
         ids = list(self.story.branches.keys())
@@ -1572,12 +2531,15 @@ class ChapterEditor(tk.Tk):
         if dlg.result_ok and dlg.choice:
             br = self.story.branches[self.current_branch_id]
             br.choices.append(dlg.choice)
+            self.story.link_choice(br, dlg.choice)
+            self.story.mark_dirty(br.branch_id)
             self.tree_choices.insert("", tk.END, values=(dlg.choice.text, dlg.choice.target_id))
             self._set_dirty(True)
-            self._update_code_editor()
+            self._schedule_code_update()
             self.undo_manager.record()
 
     def _edit_choice(self):
+        self._commit_pending_edit()
         sel = self.tree_choices.selection()
         if not sel or self.current_branch_id is None:
             return
@@ -1588,25 +2550,31 @@ class ChapterEditor(tk.Tk):
         vars = self._collect_variables()
         dlg = ChoiceEditor(self, tr("edit_choice"), cur, ids, vars)
         if dlg.result_ok and dlg.choice:
+            self.story.unlink_choice(cur)
             br.choices[idx] = dlg.choice
+            self.story.link_choice(br, dlg.choice)
+            self.story.mark_dirty(br.branch_id)
             self.tree_choices.item(sel[0], values=(dlg.choice.text, dlg.choice.target_id))
             self._set_dirty(True)
-            self._update_code_editor()
+            self._schedule_code_update()
             self.undo_manager.record()
 
     def _delete_choice(self):
+        self._commit_pending_edit()
         sel = self.tree_choices.selection()
         if not sel or self.current_branch_id is None:
             return
         idx = self.tree_choices.index(sel[0])
         br = self.story.branches[self.current_branch_id]
-        br.choices.pop(idx)
+        self.story.unlink_choice(br.choices.pop(idx))
+        self.story.mark_dirty(br.branch_id)
         self.tree_choices.delete(sel[0])
         self._set_dirty(True)
-        self._update_code_editor()
+        self._schedule_code_update()
         self.undo_manager.record()
 
     def _reorder_choice(self, delta: int):
+        self._commit_pending_edit()
         sel = self.tree_choices.selection()
         if not sel or self.current_branch_id is None:
             return
@@ -1616,13 +2584,15 @@ class ChapterEditor(tk.Tk):
         if new_idx < 0 or new_idx >= len(br.choices):
             return
         br.choices[cur_idx], br.choices[new_idx] = br.choices[new_idx], br.choices[cur_idx]
-        for i in self.tree_choices.get_children():
-            self.tree_choices.delete(i)
-        for c in br.choices:
-            self.tree_choices.insert("", tk.END, values=(c.text, c.target_id))
-        self.tree_choices.selection_set(self.tree_choices.get_children()[new_idx])
+        self.story.mark_dirty(br.branch_id)
+        # 두 행만 자리를 바꾼다.
+        children = self.tree_choices.get_children()
+        iid_cur, iid_new = children[cur_idx], children[new_idx]
+        self.tree_choices.move(iid_cur, "", new_idx)
+        self.tree_choices.move(iid_new, "", cur_idx)
+        self.tree_choices.selection_set(iid_cur)
         self._set_dirty(True)
-        self._update_code_editor()
+        self._schedule_code_update()
         self.undo_manager.record()
 
     # ---------- 찾기/변경 ----------
@@ -1673,23 +2643,49 @@ class ChapterEditor(tk.Tk):
         self.find_results = []
         self.find_index = -1
 
+    def _clear_find_caches(self) -> None:
+        """Forget cached branch texts and hits; call whenever ``self.story`` is replaced."""
+        self._find_text_cache.clear()
+        self._find_hits.clear()
+
+    def _drop_find_cache(self, bid: str) -> None:
+        """Forget cached text and hits of a deleted or renamed branch."""
+        self._find_text_cache.pop(bid, None)
+        self._find_hits.pop(bid, None)
+
+    def _find_text(self, br: Branch) -> str:
+        # 본문이 바뀌면 paragraphs 리스트가 새로 만들어지므로 그 객체를 버전으로 쓴다.
+        cached = self._find_text_cache.get(br.branch_id)
+        if cached is not None and cached[0] is br.paragraphs:
+            return cached[1]
+        text = "\n\n".join(br.paragraphs)
+        self._find_text_cache[br.branch_id] = (br.paragraphs, text)
+        return text
+
     def _build_find_results(self, query: str, scope: str):
         self._apply_body_to_model()
         results: List[Tuple[str, int]] = []
+        if query != self._find_hits_query:
+            self._find_hits = {}
+            self._find_hits_query = query
         if scope == "branch" and self.current_branch_id:
-            br = self.story.branches[self.current_branch_id]
-            text = "\n\n".join(br.paragraphs)
-            idx = text.find(query)
-            while idx != -1:
-                results.append((self.current_branch_id, idx))
-                idx = text.find(query, idx + len(query))
+            targets = [self.story.branches[self.current_branch_id]]
         else:
-            for bid, br in self.story.branches.items():
-                text = "\n\n".join(br.paragraphs)
-                idx = text.find(query)
-                while idx != -1:
-                    results.append((bid, idx))
-                    idx = text.find(query, idx + len(query))
+            targets = list(self.story.branches.values())
+        hits = self._find_hits
+        # 같은 검색어면 본문이 바뀐 분기만 다시 훑는다 (바꾸기 직후 재검색 등).
+        # 새로 훑을 분기들은 한 번에 넘겨 C 수준의 str.find 한 번으로 찾는다.
+        stale = []
+        for br in targets:
+            cached = hits.get(br.branch_id)
+            if cached is None or cached[0] is not br.paragraphs:
+                stale.append(br)
+        if stale:
+            found = find_in_texts([self._find_text(br) for br in stale], query)
+            for br, offsets in zip(stale, found):
+                hits[br.branch_id] = (br.paragraphs, offsets)
+        for br in targets:
+            results.extend((br.branch_id, i) for i in hits[br.branch_id][1])
         self.find_results = results
         self.find_index = -1
         self._last_find_text = query
@@ -1739,75 +2735,74 @@ class ChapterEditor(tk.Tk):
             self._load_chapter_to_form(br.chapter_id)
         if bid != self.current_branch_id:
             self._load_branch_to_form(bid)
-        start = f"1.0+{pos}c"
+        start = self.txt_body.index(f"1.0+{pos}c")
         end = f"{start}+{len(query)}c"
         self.txt_body.delete(start, end)
         self.txt_body.insert(start, replacement)
-        highlight_variables(self.txt_body, lambda: self._collect_variables())
+        self._highlight_body_changes()
         self._apply_body_to_model()
         self._build_find_results(query, self.find_scope.get())
         self._find_step(1)
 
     def _merge_comments(self, original: str, updated: str) -> str:
-        parser = StoryParser()
-        orig_lines = original.splitlines()
-        upd_lines = updated.splitlines()
-        comments_before: Dict[int, List[str]] = {}
-        inline_comments: Dict[int, str] = {}
+        if ";" not in original and not LINE_TRAILING_SPACE_RE.search(original):
+            # 옮겨 올 주석(과 줄 끝 공백)이 없으면 아래 병합은 updated 줄을 그대로 잇는 것과 같다.
+            return "\n".join(updated.splitlines())
+        strip_comment = StoryParser()._strip_inline_comment
+        # 원본의 주석 아닌 줄마다: 그 앞에 있던 주석 줄들과 줄 끝 주석
+        comments_before: List[List[str]] = []
+        inline_comments: List[str] = []
         buffer: List[str] = []
-        idx = 0
         in_block = False
-        for line in orig_lines:
+        for line in original.splitlines():
             stripped = line.strip()
             if stripped == ';':
                 buffer.append(line)
                 in_block = not in_block
                 continue
-            if in_block:
-                buffer.append(line)
-                continue
-            if stripped.startswith(';'):
+            if in_block or stripped.startswith(';'):
                 buffer.append(line)
                 continue
-            base = parser._strip_inline_comment(line)
-            comment_part = line[len(base):]
-            comments_before[idx] = buffer
-            inline_comments[idx] = comment_part
+            comments_before.append(buffer)
+            inline_comments.append(line[len(strip_comment(line)):])
             buffer = []
-            idx += 1
         trailing = buffer
 
         merged: List[str] = []
         recent_comments: List[str] = []
+        n_orig = len(comments_before)
         idx = 0  # index for non-comment lines
         in_block = False
-        for line in upd_lines:
+        for line in updated.splitlines():
             stripped = line.strip()
             if stripped == ';':
                 merged.append(line)
                 recent_comments.append(line)
                 in_block = not in_block
-            elif in_block:
-                merged.append(line)
-                recent_comments.append(line)
-            elif stripped.startswith(';'):
+            elif in_block or stripped.startswith(';'):
                 merged.append(line)
                 recent_comments.append(line)
             else:
-                existing = set(recent_comments)
-                for c in comments_before.get(idx, []):
-                    if c not in existing:
-                        merged.append(c)
-                # ``existing`` is intentionally not updated here so that
-                # identical comment lines (e.g., block comment delimiters
-                # marked by lone ';') are preserved in their original order
-                # without being mistakenly deduplicated.
-                base = parser._strip_inline_comment(line)
-                if line[len(base):]:
+                if idx < n_orig:
+                    before = comments_before[idx]
+                    if before and recent_comments:
+                        # ``existing`` is intentionally not updated here so that
+                        # identical comment lines (e.g., block comment delimiters
+                        # marked by lone ';') are preserved in their original order
+                        # without being mistakenly deduplicated.
+                        existing = set(recent_comments)
+                        merged.extend(c for c in before if c not in existing)
+                    else:
+                        merged.extend(before)
+                    inline = inline_comments[idx]
+                else:
+                    inline = ""
+                if line[len(strip_comment(line)):]:
                     merged.append(line)
                 else:
-                    merged.append(line + inline_comments.get(idx, ""))
-                recent_comments = []
+                    merged.append(line + inline)
+                if recent_comments:
+                    recent_comments = []
                 idx += 1
         if trailing:
             for c in trailing:
@@ -1819,7 +2814,11 @@ class ChapterEditor(tk.Tk):
                     merged.append(c)
         return "\n".join(merged)
 
-    def _update_code_editor(self, force: bool = False):
+    def _update_code_editor(self, force: bool = False, when_hidden: bool = False):
+        self._cancel_code_update()
+        if self._meta_refresh_job is not None:
+            # 시작 분기 보정이 직렬화보다 먼저 반영되도록 한다.
+            self._refresh_meta_panel()
         # 사용자가 코드 편집기를 수정했을 때는 기본 덮어쓰기를 막는다.
         # 단, 의도적으로 버리기/강제 동기화가 필요할 땐 force=True로 호출.
         if self.code_modified and not force:
@@ -1827,75 +2826,96 @@ class ChapterEditor(tk.Tk):
 
         self._apply_body_to_model()
 
-        parser = StoryParser()
+        if not (force or when_hidden or self._code_tab_visible()):
+            # 코드 탭이 가려져 있으면 직렬화는 탭이 보일 때 한 번만 한다.
+            self._code_stale = True
+            return
+
         serialized = self.story.serialize().rstrip()
-        current = self.txt_code.get("1.0", tk.END).rstrip("\n")
+        if not force and serialized == self._code_serialized:
+            # 직렬화 결과가 그대로면 주석 병합과 텍스트 비교를 건너뛴다.
+            return
+        if self.code_modified or self._code_synced_text is None:
+            raw = self.txt_code.get("1.0", "end-1c")
+        else:
+            # 마지막 동기화 뒤로 사용자가 고치지 않았으면 위젯 내용은 그 텍스트 그대로다.
+            raw = self._code_synced_text
+        current = raw.rstrip("\n")
         txt = serialized if force else self._merge_comments(current, serialized)
 
         self._code_updating = True
         try:
-            self.txt_code.delete("1.0", tk.END)
-            self.txt_code.insert(tk.END, txt)
+            # 바뀐 분기 부분만 교체해 큰 작품에서도 전체 재삽입을 피한다.
+            replace_changed_lines(self.txt_code, raw, txt)
             self.txt_code.edit_modified(False)
         finally:
             self._code_updating = False
 
+        self._code_synced_text = txt
+        self._code_serialized = serialized
         self.code_modified = False
 
     def _apply_code_to_model(self, silent: bool = False) -> bool:
         if not self.code_modified:
             return True
+        # 지금 바로 반영하므로 예약/진행 중인 백그라운드 파싱은 버린다.
+        self._cancel_code_parse()
+        self._commit_pending_edit()
         txt = self.txt_code.get("1.0", tk.END)
-        parser = StoryParser()
+        if txt[:-1] == self._code_synced_text:
+            # 수정했다가 되돌린 경우: 다시 파싱할 필요 없이 모델 쪽 변경만 반영해 둔다.
+            self.code_modified = False
+            self._schedule_code_update()
+            return True
         try:
-            story = parser.parse(txt)
+            story = parse_editor_code(txt)
         except ParseError as e:
             if not silent:
                 messagebox.showerror(tr("parse_error"), str(e))
             return False
-        # 댓글이 포함된 원본에서 분기 제목과 본문을 다시 추출
-        branch_texts = parser.extract_branch_texts(txt)
-        for bid, br in story.branches.items():
-            if bid in branch_texts:
-                title, body = branch_texts[bid]
-                br.title = title
-                br.raw_text = body
+        self._install_code_story(story, txt)
+        return True
+
+    def _install_code_story(self, story: Story, txt: str) -> None:
+        """Make ``story``, parsed from code-editor text ``txt``, the edited story."""
         self.story = story
+        self._clear_find_caches()
         self.current_branch_id = story.start_id
         br = self.story.get_branch(self.current_branch_id) if self.current_branch_id else None
         self.current_chapter_id = (
             br.chapter_id if br else (next(iter(self.story.chapters.keys())) if self.story.chapters else None)
         )
-        self.ent_title.delete("1.0", tk.END)
-        self.ent_title.insert("1.0", self.story.title)
+        self._load_title_field()
+        self._rebuild_order_index()
         self._refresh_chapter_list()
         # 코드 편집기에서 변경된 메타데이터를 반영
-        self._refresh_meta_panel()
+        self._schedule_meta_refresh()
         if self.current_chapter_id:
             self._load_chapter_to_form(self.current_chapter_id)
             if self.current_branch_id:
                 self._load_branch_to_form(self.current_branch_id)
         else:
             self.txt_body.delete("1.0", tk.END)
-            highlight_variables(self.txt_body, lambda: self._collect_variables())
-            for i in self.tree_choices.get_children():
-                self.tree_choices.delete(i)
+            self._highlight_body()
+            self._sync_tree_rows(self.tree_choices, [])
+        # 코드 편집기 텍스트가 원본이므로 예약된 재직렬화는 버린다.
+        self._cancel_code_update()
         # 코드 편집기 텍스트의 수정 플래그 초기화
         self.txt_code.edit_modified(False)
+        self._code_synced_text = txt[:-1]
+        self._code_serialized = None
         self.code_modified = False
         self._set_dirty(True)
         self.undo_manager.record()
-        return True
 
     def _run_story(self):
         """branching_novel.py에 의존하지 않고 내장 실행기로 현재 스토리를 실행한다."""
         if not self._apply_code_to_model():
             return
+        self._flush_pending_updates()
         self._apply_body_to_model()
 
-        import copy
-
-        story_copy = copy.deepcopy(self.story)
+        story_copy = self.story.clone()
         file_path = self.current_file or "<editor>"
         app = BranchingNovelApp(story_copy, file_path, show_disabled=self.story.show_disabled)
         app.mainloop()
@@ -1903,6 +2923,7 @@ class ChapterEditor(tk.Tk):
     def _validate_story(self, auto: bool = False):
         if not self._apply_code_to_model():
             return
+        self._flush_pending_updates()
         self._apply_body_to_model()
         errors: List[str] = []
         warnings: List[str] = []
@@ -1936,27 +2957,22 @@ class ChapterEditor(tk.Tk):
         var_types: Dict[str, Set[type]] = {}
         for name, val in self.story.variables.items():
             var_types.setdefault(name, set()).add(type(val))
+        # 한 번만 순회하며 타입을 모으고, 검사할 연산은 (변수, 연산)별 첫 항목만 남긴다.
+        numeric_acts: Dict[Tuple[str, str], Action] = {}
         for br in self.story.branches.values():
             for act in br.actions:
                 if act.op == "expr":
                     # Expression results are dynamic; skip type inference to avoid false positives
                     continue
-                val_type = type(act.value)
-                var_types.setdefault(act.var, set()).add(val_type)
-        numeric_ops = {"add", "sub", "mul", "div", "floordiv", "mod", "pow"}
-        warned = set()
-        for br in self.story.branches.values():
-            for act in br.actions:
-                if act.op in numeric_ops:
-                    types = var_types.get(act.var, set())
-                    if str in types:
-                        key = (act.var, act.op)
-                        if key not in warned:
-                            warned.add(key)
-                            warnings.append(
-                                tr("warn_numeric_non_numeric", var=act.var, op=act.op)
-                                + _line_info(act.line, act.source)
-                            )
+                var_types.setdefault(act.var, set()).add(type(act.value))
+                if act.op in NUMERIC_OPS:
+                    numeric_acts.setdefault((act.var, act.op), act)
+        for (var, op), act in numeric_acts.items():
+            if str in var_types.get(var, ()):
+                warnings.append(
+                    tr("warn_numeric_non_numeric", var=var, op=op)
+                    + _line_info(act.line, act.source)
+                )
 
         msg = []
         if errors:
@@ -1997,6 +3013,7 @@ class ChapterEditor(tk.Tk):
         if not self._confirm_discard_changes():
             return
         self.story = Story()
+        self._clear_find_caches()
         ch_id = self.story.ensure_unique_chapter_id("chapter")
         chapter = Chapter(chapter_id=ch_id, title="Introduction")
         self.story.chapters[ch_id] = chapter
@@ -2008,14 +3025,14 @@ class ChapterEditor(tk.Tk):
         self.current_chapter_id = ch_id
         self.current_branch_id = br_id
         self.current_file = None
-        self.ent_title.delete("1.0", tk.END)
-        self.ent_title.insert("1.0", self.story.title)
+        self._load_title_field()
+        self._rebuild_order_index()
         self._refresh_chapter_list()
         self._load_chapter_to_form(ch_id)
         self._refresh_meta_panel()
         self._update_code_editor()
         self._set_dirty(False)
-        self.undo_manager = UndoManager(self._capture_state, self._restore_state)
+        self.undo_manager = UndoManager(self._capture_state, self._restore_state, copy_state=False)
 
     def _open_file(self):
         if not self._confirm_discard_changes():
@@ -2026,15 +3043,8 @@ class ChapterEditor(tk.Tk):
         try:
             with open(path, "r", encoding="utf-8") as f:
                 text = f.read()
-            parser = StoryParser()
-            story = parser.parse(text)
             # Restore comments in branch titles and bodies for editor views
-            branch_texts = parser.extract_branch_texts(text)
-            for bid, br in story.branches.items():
-                if bid in branch_texts:
-                    title, body = branch_texts[bid]
-                    br.title = title
-                    br.raw_text = body
+            story = parse_editor_code(text)
         except ParseError as e:
             messagebox.showerror(tr("parse_error"), str(e))
             return
@@ -2043,41 +3053,50 @@ class ChapterEditor(tk.Tk):
             return
 
         self.story = story
+        self._clear_find_caches()
         self.current_branch_id = story.start_id
         br = self.story.get_branch(self.current_branch_id) if self.current_branch_id else None
         self.current_chapter_id = br.chapter_id if br else (next(iter(self.story.chapters.keys())) if self.story.chapters else None)
         self.current_file = path
 
-        self.ent_title.delete("1.0", tk.END)
-        self.ent_title.insert("1.0", self.story.title)
+        self._load_title_field()
+        self._rebuild_order_index()
         self._refresh_chapter_list()
         if self.current_chapter_id:
             self._load_chapter_to_form(self.current_chapter_id)
             if self.current_branch_id:
                 self._load_branch_to_form(self.current_branch_id)
-        self._refresh_meta_panel()
+        self._schedule_meta_refresh()
         # Preserve original comments by using the raw text in the code editor
+        self._cancel_code_update()
         self._code_updating = True
         try:
-            self.txt_code.delete("1.0", tk.END)
-            self.txt_code.insert(tk.END, text)
+            # 새 파일이므로 커서를 먼저 처음으로 옮겨 두고 한 번에 교체한다.
+            self.txt_code.mark_set(tk.INSERT, "1.0")
+            self.txt_code.replace("1.0", "end-1c", text)
             self.txt_code.edit_modified(False)
         finally:
             self._code_updating = False
+        self._code_synced_text = self.txt_code.get("1.0", "end-1c")
+        self._code_serialized = None
         self.code_modified = False
         self._set_dirty(False)
-        self.undo_manager = UndoManager(self._capture_state, self._restore_state)
-        self.title(f"Branching Novel Editor - {os.path.basename(path)}")
+        self.undo_manager = UndoManager(self._capture_state, self._restore_state, copy_state=False)
         self._validate_story(auto=True)
 
+    def _code_text_for_save(self) -> str:
+        # "end-1c"까지 읽으면 Tk가 붙이는 마지막 줄바꿈이 빠져 보통 rstrip이 사본을 만들지 않는다.
+        return self.txt_code.get("1.0", "end-1c").rstrip("\n")
+
     def _save_file(self):
         if self.current_file is None:
             self._save_file_as()
             return
         if not self._apply_code_to_model():
             return
+        self._flush_pending_updates()
         self._apply_body_to_model()
-        txt = self.txt_code.get("1.0", tk.END).rstrip("\n")
+        txt = self._code_text_for_save()
         if self.dirty:
             parser = StoryParser()
             serialized = self.story.serialize()
@@ -2085,19 +3104,19 @@ class ChapterEditor(tk.Tk):
             if clean_code != serialized:
                 # 본문에서 변경된 내용이 있다면 코드 편집기 갱신이 필요
                 self._update_code_editor(force=True)
-                txt = self.txt_code.get("1.0", tk.END).rstrip("\n")
+                txt = self._code_text_for_save()
         try:
-            with open(self.current_file, "w", encoding="utf-8") as f:
-                f.write(txt + "\n")
+            write_story_file(self.current_file, txt)
         except Exception as e:
             messagebox.showerror(tr("error"), tr("save_error", err=e))
             return
         self._set_dirty(False)
-        messagebox.showinfo(tr("save_title"), tr("save_done"))
+        self._set_status(tr("save_done"))
 
     def _save_file_as(self):
         if not self._apply_code_to_model():
             return
+        self._flush_pending_updates()
         self._apply_body_to_model()
         path = filedialog.asksaveasfilename(
             title=tr("save_as_title"),
@@ -2107,24 +3126,32 @@ class ChapterEditor(tk.Tk):
         )
         if not path:
             return
-        txt = self.txt_code.get("1.0", tk.END).rstrip("\n")
+        txt = self._code_text_for_save()
         if self.dirty:
             parser = StoryParser()
             serialized = self.story.serialize()
             clean_code = "\n".join(parser._remove_comments(txt.splitlines())).rstrip()
             if clean_code != serialized:
                 self._update_code_editor(force=True)
-                txt = self.txt_code.get("1.0", tk.END).rstrip("\n")
+                txt = self._code_text_for_save()
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(txt + "\n")
+            write_story_file(path, txt)
         except Exception as e:
             messagebox.showerror(tr("error"), tr("save_error", err=e))
             return
         self.current_file = path
         self._set_dirty(False)
-        self.title(f"Branching Novel Editor - {os.path.basename(path)}")
-        messagebox.showinfo(tr("save_title"), tr("save_done"))
+        self._set_status(tr("save_done"))
+
+    def _set_status(self, text: str, timeout_ms: int = 2000):
+        """Show a transient message in the bottom bar; empty text clears it."""
+        if self._status_clear_job is not None:
+            self.after_cancel(self._status_clear_job)
+            self._status_clear_job = None
+        self.lbl_status.configure(text=text)
+        if text and timeout_ms:
+            self._status_clear_job = self.after(timeout_ms, self._set_status, "")
+
     def _exit_app(self):
         # 더티 플래그가 있으면 저장 여부 확인
         if self.dirty:
@@ -2140,16 +3167,22 @@ class ChapterEditor(tk.Tk):
                     # 사용자가 '다른 이름으로 저장'에서 취소했거나, 파싱/저장 오류로 실패
                     return
                 # 저장 성공 → 종료
-                self.destroy()
+                self._close()
                 return
             # res is False (아니오) → 저장하지 않고 종료
-            self.destroy()
+            self._close()
             return
 
         # 3) 변경사항이 없으면 바로 종료
+        self._close()
+
+    def _close(self) -> None:
+        self._shutdown_worker()
         self.destroy()
 
     def _confirm_discard_changes(self) -> bool:
+        # 예약된 본문 반영이 새 작품에 덮어쓰이지 않도록 지금 끝내 둔다.
+        self._commit_pending_edit()
         if not self.dirty:
             return True
         res = messagebox.askyesnocancel(tr("unsaved_changes_title"), tr("unsaved_changes_prompt"))
@@ -2160,12 +3193,65 @@ class ChapterEditor(tk.Tk):
             return not self.dirty
         return True
 
+    def _schedule_ui_refresh(self) -> None:
+        """Run one variable-list/code-editor refresh at the next idle point.
+
+        Repeated calls before the event loop goes idle collapse into a single
+        refresh, so several quick variable edits cost one redraw.
+        """
+        if self._ui_refresh_job is None:
+            self._ui_refresh_job = self.after_idle(self._flush_ui_refresh)
+
+    def _flush_ui_refresh(self) -> None:
+        self._ui_refresh_job = None
+        self._set_dirty(True)
+        self._refresh_variable_list()
+        self._update_code_editor()
+        self.undo_manager.record()
+
+    def _schedule_code_update(self) -> None:
+        """Re-serialize into the code editor once the event loop goes idle.
+
+        Several model edits in a row then cost a single serialization.
+        """
+        if self._code_update_job is None:
+            self._code_update_job = self.after_idle(self._update_code_editor)
+
+    def _cancel_code_update(self) -> None:
+        self._code_stale = False
+        if self._code_update_job is not None:
+            self.after_cancel(self._code_update_job)
+            self._code_update_job = None
+
+    def _code_tab_visible(self) -> bool:
+        return self.nb_right.select() == str(self._code_tab)
+
+    def _on_right_tab_changed(self, _evt=None) -> None:
+        if self._code_stale and self._code_tab_visible():
+            self._update_code_editor()
+
+    def _schedule_meta_refresh(self) -> None:
+        if self._meta_refresh_job is None:
+            self._meta_refresh_job = self.after_idle(self._refresh_meta_panel)
+
+    def _flush_pending_updates(self) -> None:
+        """Run scheduled body/meta-panel/code-editor updates immediately."""
+        self._commit_pending_edit()
+        if self._meta_refresh_job is not None:
+            self._refresh_meta_panel()
+        if self._code_update_job is not None or self._code_stale:
+            self._update_code_editor(when_hidden=True)
+
     def _set_dirty(self, val: bool):
         self.dirty = val
         mark = "*" if self.dirty else ""
         base = "Branching Novel Editor"
         tail = f" - {os.path.basename(self.current_file)}" if self.current_file else ""
-        self.title(f"{base}{tail}{mark}")
+        title = f"{base}{tail}{mark}"
+        # 키 입력마다 불리므로 창 제목이 실제로 바뀔 때만 창 관리자에 알린다.
+        if title != self._window_title:
+            self.title(title)
+            self._window_title = title
 
     # ---------- 무한 루프 검사 ----------
     def _analyze_infinite_loops(self, show_window: bool = True):
@@ -2199,10 +3285,20 @@ class ChapterEditor(tk.Tk):
         def as_point(v):
             return (float(v), float(v))
 
-        def join_interval(a, b):
-            alo, ahi = a
-            blo, bhi = b
-            return (min(alo, blo), max(ahi, bhi))
+        # 상태(변수 번호별 구간 리스트) 단위 합치기: 변수마다 함수를 부르지 않도록 한 번에 계산한다.
+        def join_states(a, b):
+            return [
+                (alo if alo <= blo else blo, ahi if ahi >= bhi else bhi)
+                for (alo, ahi), (blo, bhi) in zip(a, b)
+            ]
+
+        def widen_states(a, b):
+            # 표준 확장(widening): 커지는 쪽 경계는 곧바로 무한대로 보내 반복 없이 수렴시킨다.
+            # BIG 대신 inf를 써야 pick_mid가 경계 근처 값을 고른다(±1e18 근처는 ±1이 반올림돼 사라짐).
+            return [
+                (alo if blo >= alo else -math.inf, ahi if bhi <= ahi else math.inf)
+                for (alo, ahi), (blo, bhi) in zip(a, b)
+            ]
 
         def meet_interval(iv, lower=None, upper=None, open_lower=False, open_upper=False):
             lo, hi = iv
@@ -2217,40 +3313,12 @@ class ChapterEditor(tk.Tk):
         def widen_unknown(_iv):
             return (-BIG, BIG)
 
-        # 조건 파싱/평가(AND만 지원)
-        simple_atom_re = re.compile(r"^\s*([A-Za-z_]\w*)\s*(==|!=|>=|<=|>|<)\s*([^\s]+)\s*$", re.IGNORECASE)
-
-        def _num_parse(val_text):
-            vv = val_text.strip().lower()
-            if vv == "true":  return 1.0
-            if vv == "false": return 0.0
-            if re.match(r"^-?\d+$", vv): return float(int(vv))
-            try:
-                return float(vv)
-            except Exception:
-                return None
-
-        def parse_condition(cond_text):
-            if not cond_text or cond_text.strip() == "": return []
-            lc = cond_text.lower()
-            if " or " in lc or " not " in lc or "(" in lc or ")" in lc or "|" in cond_text or "&" in cond_text:
-                return None  # 복잡식은 불확실
-            parts = re.split(r"\s+and\s+", cond_text, flags=re.IGNORECASE)
-            atoms = []
-            for part in parts:
-                m = simple_atom_re.match(part)
-                if not m: return None
-                var, op, val = m.groups()
-                c = _num_parse(val)
-                if c is None: return None
-                atoms.append((var, op, c))
-            return atoms
-
+        # 조건 파싱/평가(AND만 지원): 파싱은 parse_loop_condition이 조건 문자열별로 캐시한다.
         def eval_atoms_over_interval(atoms, state_map):
             # 항상 참/항상 거짓/불확실(None)
             result = True
             for var, op, c in atoms:
-                lo, hi = state_map.get(var, as_point(0.0))
+                lo, hi = state_map[var]
                 tri = None
                 if op == "==":
                     if lo == hi == c:
@@ -2290,10 +3358,10 @@ class ChapterEditor(tk.Tk):
 
         def refine_with_atoms(atoms, st):
             # 가드로 상태를 좁힘. 불가능이면 None
-            if not atoms: return dict(st)
-            cur = dict(st)
+            if not atoms: return list(st)
+            cur = list(st)
             for var, op, c in atoms:
-                lo, hi = cur.get(var, as_point(0.0))
+                lo, hi = cur[var]
                 if op == "==":
                     new_iv = meet_interval((lo, hi), lower=c, upper=c)
                 elif op == "!=":
@@ -2334,176 +3402,228 @@ class ChapterEditor(tk.Tk):
                 if not ok: return False
             return True
 
-        # 액션
-        def apply_actions_interval(pre_state, actions):
-            st = dict(pre_state)
+        # 액션: 분기마다 (변수, 연산 코드, 값) 목록으로 한 번만 변환해 두고 반복마다 재사용한다.
+        OP_SET, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_FLOORDIV, OP_MOD, OP_POW, OP_NAN, OP_KEEP = range(10)
+        op_codes = {
+            "set": OP_SET, "add": OP_ADD, "sub": OP_SUB, "mul": OP_MUL, "div": OP_DIV,
+            "floordiv": OP_FLOORDIV, "mod": OP_MOD, "pow": OP_POW,
+        }
+
+        def compile_actions(actions):
+            prog = []
             for act in actions:
-                var = act.var
-                cur = st.get(var, as_point(0.0))
                 val = act.value
                 if not isinstance(val, (int, float)):
-                    st[var] = widen_unknown(cur)
-                    continue
-                if act.op == "set":
-                    st[var] = as_point(val)
-                elif act.op == "add":
-                    lo, hi = cur
+                    prog.append((var_id[act.var], OP_NAN, 0.0))
+                else:
+                    prog.append((var_id[act.var], op_codes.get(act.op, OP_KEEP), float(val)))
+            return prog
+
+        def apply_actions_interval(pre_state, prog):
+            st = list(pre_state)
+            for var, op, val in prog:
+                if op == OP_SET:
+                    st[var] = (val, val)
+                elif op == OP_ADD:
+                    lo, hi = st[var]
                     st[var] = (lo + val, hi + val)
-                elif act.op == "sub":
-                    lo, hi = cur
+                elif op == OP_SUB:
+                    lo, hi = st[var]
                     st[var] = (lo - val, hi - val)
                 else:
-                    st[var] = widen_unknown(cur)
+                    st[var] = widen_unknown(None)
             return st
 
-        def apply_actions_concrete(valuation, actions):
+        def apply_actions_concrete(valuation, prog):
+            # compile_actions가 값을 모두 float으로 바꿔 두었고 valuation도 float뿐이라
+            # 연산 결과를 다시 float()으로 감쌀 필요가 없다. 프로그램의 변수는 모두 valuation에 있다.
             v = dict(valuation)
-            for act in actions:
-                var = act.var
-                a = v.get(var, 0.0)
-                b = act.value
-                if not isinstance(b, (int, float)):
-                    v[var] = float('nan')
+            for var, op, b in prog:
+                if op == OP_NAN:
+                    v[var] = math.nan
                     continue
-                if act.op == "set":
-                    v[var] = float(b)
-                elif act.op == "add":
-                    v[var] = float(a + b)
-                elif act.op == "sub":
-                    v[var] = float(a - b)
-                elif act.op == "mul":
-                    v[var] = float(a * b)
-                elif act.op == "div":
-                    try:
-                        v[var] = float(a / b)
-                    except Exception:
-                        v[var] = float('inf') if a >= 0 else float('-inf')
-                elif act.op == "floordiv":
-                    try:
-                        v[var] = float(a // b)
-                    except Exception:
-                        v[var] = float('inf') if a >= 0 else float('-inf')
-                elif act.op == "mod":
-                    try:
-                        v[var] = float(a % b)
-                    except Exception:
-                        v[var] = 0.0
-                elif act.op == "pow":
-                    try:
-                        v[var] = float(a ** b)
-                    except Exception:
-                        v[var] = float('inf')
+                a = v[var]
+                if op == OP_SET:
+                    v[var] = b
+                elif op == OP_ADD:
+                    v[var] = a + b
+                elif op == OP_SUB:
+                    v[var] = a - b
+                elif op == OP_MUL:
+                    v[var] = a * b
+                elif op == OP_DIV:
+                    if b != 0:
+                        v[var] = a / b
+                    else:
+                        v[var] = math.inf if a >= 0 else -math.inf
+                elif op == OP_FLOORDIV:
+                    if b != 0:
+                        v[var] = a // b
+                    else:
+                        v[var] = math.inf if a >= 0 else -math.inf
+                elif op == OP_MOD:
+                    v[var] = a % b if b != 0 else 0.0
+                elif op == OP_POW:
+                    # 0의 음수 거듭제곱, 음수의 소수 거듭제곱(복소수)은 미리 걸러낸다.
+                    if (a == 0 and b < 0) or (
+                        a < 0 and a != -math.inf and math.isfinite(b) and b % 1
+                    ):
+                        v[var] = math.inf
+                    else:
+                        try:
+                            v[var] = a ** b
+                        except OverflowError:
+                            v[var] = math.inf
                 else:
                     v[var] = a
             return v
 
-        # 엣지(가드) 준비
+        # 엣지(가드)와 SCC용 그래프를 선택지 한 번 순회로 함께 준비
         edges = {}
+        graph = {}
         for bid, br in branches.items():
             lst = []
+            succ = []
             for ch in br.choices:
-                atoms = parse_condition(ch.condition or "")
-                lst.append((ch, atoms))
+                lst.append((ch, parse_loop_condition(ch.condition or "")))
+                if ch.target_id in branches:
+                    succ.append(ch.target_id)
             edges[bid] = lst
+            graph[bid] = succ
 
-        # 2) 고정점 전파(가드로 필터)
-        initial = {k: as_point(v) for k, v in story.variables.items()}
+        # 변수 이름을 0부터의 번호로 바꿔, 구간 상태를 딕셔너리 대신 번호로 색인하는 리스트로 다룬다.
+        var_id: Dict[str, int] = {}
+        for name in story.variables:
+            var_id.setdefault(name, len(var_id))
+        for br in branches.values():
+            for act in br.actions:
+                var_id.setdefault(act.var, len(var_id))
+        for lst in edges.values():
+            for ch, atoms in lst:
+                for var, _, _ in atoms or ():
+                    var_id.setdefault(var, len(var_id))
+        var_names = list(var_id)
+        zero_state = [as_point(0.0)] * len(var_names)
+        for bid, lst in edges.items():
+            edges[bid] = [
+                (ch, None if atoms is None else [(var_id[var], op, c) for var, op, c in atoms])
+                for ch, atoms in lst
+            ]
+        programs = {bid: compile_actions(br.actions) for bid, br in branches.items()}
+
+        # 2) SCC (고정점 전파에서 루프 안쪽 엣지를 가려내는 데 쓴다)
+        index = {};
+        lowlink = {};
+        stack = [];
+        onstack = set();
+        cur_idx = [0];
+        scc_list = []
+
+        def strongconnect(root):
+            # 재귀 대신 (노드, 후속 반복자) 작업 스택을 쓰는 Tarjan: 긴 분기 사슬에서도 재귀 한도에 걸리지 않는다.
+            index[root] = lowlink[root] = cur_idx[0]
+            cur_idx[0] += 1
+            stack.append(root)
+            onstack.add(root)
+            work = [(root, iter(graph.get(root, ())))]
+            while work:
+                v, it = work[-1]
+                for w in it:
+                    if w not in index:
+                        index[w] = lowlink[w] = cur_idx[0]
+                        cur_idx[0] += 1
+                        stack.append(w)
+                        onstack.add(w)
+                        work.append((w, iter(graph.get(w, ()))))
+                        break
+                    elif w in onstack:
+                        lowlink[v] = min(lowlink[v], index[w])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[v])
+                    if lowlink[v] == index[v]:
+                        comp = []
+                        while True:
+                            w = stack.pop()
+                            onstack.remove(w)
+                            comp.append(w)
+                            if w == v: break
+                        scc_list.append(comp)
+
+        for v in graph.keys():
+            if v not in index:
+                strongconnect(v)
+
+        comp_of = {bid: i for i, comp in enumerate(scc_list) for bid in comp}
+        self_loops = {bid for bid, succ in graph.items() if bid in succ}
+
+        # 3) 고정점 전파(가드로 필터, 같은 SCC 안의 엣지는 확장으로 합침)
+        initial = list(zero_state)
+        for k, v in story.variables.items():
+            # 문자열 변수는 수치 구간을 알 수 없으므로 전체 범위로 둔다.
+            initial[var_id[k]] = as_point(v) if isinstance(v, (int, float)) else widen_unknown(None)
         pre_state = {bid: None for bid in branches.keys()}
         post_state = {bid: None for bid in branches.keys()}
 
-        pre_state[start_id] = dict(initial)
-        work = [start_id]
-        iter_count = {bid: 0 for bid in branches.keys()}
+        pre_state[start_id] = initial
+        # 큐에는 분기마다 한 번만 올린다: 처리 전에 다시 바뀌어도 최신 pre_state로 한 번 처리하면 된다.
+        work = deque([start_id])
+        in_work = {start_id}
+        steps = 0
         LIMIT = max(200, 10 * max(1, len(branches)))
-
-        while work and sum(iter_count.values()) < LIMIT:
-            bid = work.pop()
-            iter_count[bid] += 1
+        # 처음 몇 번은 그냥 합쳐 대입(set) 같은 유한한 변화는 정밀하게 두고, 그 뒤에만 확장한다.
+        WIDEN_DELAY = 3
+        joins = {bid: 0 for bid in branches.keys()}
+
+        while work and steps < LIMIT:
+            bid = work.popleft()
+            in_work.discard(bid)
+            steps += 1
             br = branches[bid]
-            cur_pre = pre_state[bid] or {}
-            cur_post = apply_actions_interval(cur_pre, br.actions)
+            cur_pre = pre_state[bid] or zero_state
+            cur_post = apply_actions_interval(cur_pre, programs[bid])
 
             # post join
             if post_state[bid] is None:
                 post_state[bid] = cur_post
             else:
-                merged = {}
-                keys = set(post_state[bid].keys()) | set(cur_post.keys())
-                for k in keys:
-                    a = post_state[bid].get(k, as_point(0.0))
-                    b = cur_post.get(k, as_point(0.0))
-                    merged[k] = join_interval(a, b)
-                post_state[bid] = merged
+                post_state[bid] = join_states(post_state[bid], cur_post)
 
             # 전파
             for ch, atoms in edges[bid]:
                 tgt = ch.target_id
                 if tgt not in branches: continue
                 if atoms is None:
-                    filtered = dict(post_state[bid])  # 복잡식: 필터 없이 전파
+                    filtered = list(post_state[bid])  # 복잡식: 필터 없이 전파
                 else:
                     filtered = refine_with_atoms(atoms, post_state[bid])
                 if filtered is None: continue
 
                 if pre_state[tgt] is None:
                     pre_state[tgt] = filtered
-                    work.append(tgt)
+                    if tgt not in in_work:
+                        work.append(tgt)
+                        in_work.add(tgt)
                 else:
-                    merged = {}
-                    changed = False
-                    keys = set(pre_state[tgt].keys()) | set(filtered.keys())
-                    for k in keys:
-                        a = pre_state[tgt].get(k, as_point(0.0))
-                        b = filtered.get(k, as_point(0.0))
-                        m = join_interval(a, b)
-                        merged[k] = m
-                        if m != a: changed = True
-                    if changed:
+                    joins[tgt] += 1
+                    widen = comp_of[tgt] == comp_of[bid] and joins[tgt] > WIDEN_DELAY
+                    merged = (widen_states if widen else join_states)(pre_state[tgt], filtered)
+                    if merged != pre_state[tgt]:
                         pre_state[tgt] = merged
-                        work.append(tgt)
-
-        # 3) SCC
-        graph = {bid: [c.target_id for c in br.choices if c.target_id in branches] for bid, br in branches.items()}
-
-        index = {};
-        lowlink = {};
-        stack = [];
-        onstack = set();
-        cur_idx = [0];
-        scc_list = []
-
-        def strongconnect(v):
-            index[v] = cur_idx[0];
-            lowlink[v] = cur_idx[0];
-            cur_idx[0] += 1
-            stack.append(v);
-            onstack.add(v)
-            for w in graph.get(v, []):
-                if w not in index:
-                    strongconnect(w);
-                    lowlink[v] = min(lowlink[v], lowlink[w])
-                elif w in onstack:
-                    lowlink[v] = min(lowlink[v], index[w])
-            if lowlink[v] == index[v]:
-                comp = []
-                while True:
-                    w = stack.pop();
-                    onstack.remove(w);
-                    comp.append(w)
-                    if w == v: break
-                scc_list.append(comp)
-
-        for v in graph.keys():
-            if v not in index:
-                strongconnect(v)
+                        if tgt not in in_work:
+                            work.append(tgt)
+                            in_work.add(tgt)
 
         reachable = {b for b, st in pre_state.items() if st is not None}
 
+        # 리포트의 노드 라벨마다 챕터를 찾지 않도록 제목을 미리 모아 둔다.
+        chapter_title = {cid: ch.title for cid, ch in story.chapters.items()}
+
         def label_of(bid):
             br = branches[bid]
-            ch = story.chapters.get(br.chapter_id)
-            ch_title = ch.title if ch else br.chapter_id
-            return f"{bid} | {br.title} @ {ch_title}"
+            return f"{bid} | {br.title} @ {chapter_title.get(br.chapter_id, br.chapter_id)}"
 
         # 4) 판정 + 증거 경로
         definite = []
@@ -2518,38 +3638,32 @@ class ChapterEditor(tk.Tk):
                 return lo + 1.0
             return (lo + hi) / 2.0
 
-        def build_initial_valuation(bid):
-            st = post_state.get(bid) or pre_state.get(bid) or {}
-            v = {}
-            related = set()
-            for nid in graph.keys():
-                for ch, atoms in edges[nid]:
-                    if atoms:
-                        for var, _, _ in atoms: related.add(var)
-                for a in branches[nid].actions:
-                    related.add(a.var)
-            for k in related:
-                iv = st.get(k, as_point(0.0))
-                v[k] = float(round(pick_mid(iv), 6))
-            return v
+        def build_initial_valuation(bid, related_keys):
+            st = post_state.get(bid) or pre_state.get(bid) or zero_state
+            return {k: float(round(pick_mid(st[k]), 6)) for k in related_keys}
 
         def try_witness_for_comp(comp, max_steps=400):
+            # 루프 안의 시뮬레이션은 SCC 안의 가드/액션에 나오는 변수만 읽고 쓴다.
             related = set()
             for bid in comp:
                 for ch, atoms in edges[bid]:
                     if atoms:
                         for var, _, _ in atoms: related.add(var)
-                for a in branches[bid].actions:
-                    related.add(a.var)
-            related = sorted(list(related))
+                for var, _, _ in programs[bid]:
+                    related.add(var)
+            related_keys = tuple(sorted(related))
+            comp_set = set(comp)
+            digits = (6,) * len(related_keys)
 
             def key_of(bid, val):
-                return (bid, tuple(float(round(val.get(k, 0.0), 6)) for k in related))
+                # val에는 related_keys가 모두 들어 있으므로 기본값 조회 없이 C 수준 map으로 평평한 튜플을 만든다.
+                # (정수 변환이나 바이트 패킹은 nan/inf 값에서 깨지거나 nan끼리 같은 상태로 보게 되어 쓰지 않는다.)
+                return (bid, *map(round, map(val.__getitem__, related_keys), digits))
 
             start_nodes = [b for b in comp if b in reachable]
             if not start_nodes: return None
             start = start_nodes[0]
-            val = build_initial_valuation(start)
+            val = build_initial_valuation(start, related_keys)
             seen = set();
             path = [];
             cur = start;
@@ -2562,22 +3676,19 @@ class ChapterEditor(tk.Tk):
                 br = branches[cur]
                 candidates = []
                 for ch, atoms in edges[cur]:
-                    if ch.target_id in comp:
+                    if ch.target_id in comp_set:
                         ok = eval_atoms_concrete(atoms, val) if atoms is not None else True
                         if ok or atoms is None: candidates.append((ch, atoms))
                 if not candidates: return None
                 ch, atoms = candidates[0]
-                val = apply_actions_concrete(val, br.actions)
+                val = apply_actions_concrete(val, programs[cur])
                 path.append((br.branch_id, ch.text, ch.target_id))
                 cur = ch.target_id
             return None
 
-        for comp in scc_list:
-            # 루프 아님 필터
-            if len(comp) == 1:
-                only = comp[0]
-                self_loop = any((c.target_id == only) for c in branches[only].choices)
-                if not self_loop: continue
+        for ci, comp in enumerate(scc_list):
+            # 루프 아님 필터: 자기 자신으로 가는 선택지가 없는 단일 분기 SCC가 대부분이다.
+            if len(comp) == 1 and comp[0] not in self_loops: continue
             if not any(b in reachable for b in comp): continue
 
             all_nodes_have_internal_always = True
@@ -2586,7 +3697,7 @@ class ChapterEditor(tk.Tk):
 
             for bid in comp:
                 br = branches[bid]
-                pst = post_state[bid] or pre_state[bid] or {}
+                pst = post_state[bid] or pre_state[bid] or zero_state
                 internal_always = False
                 internal_possible = False
                 external_satisfy = False
@@ -2599,7 +3710,7 @@ class ChapterEditor(tk.Tk):
                         cond_every = eval_atoms_over_interval(atoms, pst)
                         cond_sat = refine_with_atoms(atoms, pst) is not None
 
-                    if ch.target_id in comp:
+                    if comp_of.get(ch.target_id) == ci:
                         if cond_every is True:
                             internal_always = True
                             internal_possible = True
@@ -2626,6 +3737,21 @@ class ChapterEditor(tk.Tk):
                     possible.append(comp)
 
         # 5) 간결 리포트 생성
+        # 인자 없는 고정 문구는 항목마다 tr()을 거치지 않도록 한 번만 번역해 둔다.
+        T_UNCERTAIN = tr("uncertain_complex")
+        T_COMPLEX = tr("complex_expr")
+        T_COND_NONE = tr("cond_none")
+        T_ALWAYS_OPEN = tr("always_open")
+        T_POSSIBLE = tr("possible")
+        T_IMPOSSIBLE = tr("impossible")
+        T_NO_EXIT = tr("loop_no_exit")
+        T_DEFINITE_ACTION = tr("loop_definite_action")
+        T_EXAMPLE_PATH = tr("loop_example_path")
+        T_EXIT_CANDIDATES = tr("loop_exit_candidates")
+        T_WITNESSED_ACTION = tr("loop_witnessed_action")
+        T_EXIT_SUMMARY = tr("loop_exit_summary")
+        T_POSSIBLE_ACTION = tr("loop_possible_action")
+
         def nodes_summary(comp, limit=6):
             labels = [label_of(b) for b in comp]
             if len(labels) <= limit:
@@ -2635,22 +3761,23 @@ class ChapterEditor(tk.Tk):
         def exit_edges_summary(comp, max_list=3):
             # comp 바깥으로 나가는 엣지 3개까지 요약: src -> tgt | 조건 | 판정
             items = []
+            ci = comp_of[comp[0]]
             for bid in comp:
                 br = branches[bid]
-                pst = post_state[bid] or pre_state[bid] or {}
+                pst = post_state[bid] or pre_state[bid] or zero_state
                 for ch, atoms in edges[bid]:
-                    if ch.target_id in comp: continue
+                    if comp_of.get(ch.target_id) == ci: continue
                     if atoms is None:
-                        verdict = tr("uncertain_complex")
-                        cond_s = tr("complex_expr")
+                        verdict = T_UNCERTAIN
+                        cond_s = T_COMPLEX
                     else:
                         every = eval_atoms_over_interval(atoms, pst)
-                        cond_s = " and ".join(f"{v} {op} {val}" for (v, op, val) in atoms) if atoms else tr("cond_none")
+                        cond_s = " and ".join(f"{var_names[v]} {op} {val}" for (v, op, val) in atoms) if atoms else T_COND_NONE
                         if every is True:
-                            verdict = tr("always_open")
+                            verdict = T_ALWAYS_OPEN
                         else:
                             sat = refine_with_atoms(atoms, pst) is not None
-                            verdict = tr("possible") if sat else tr("impossible")
+                            verdict = T_POSSIBLE if sat else T_IMPOSSIBLE
                     items.append(f"{bid} → {ch.target_id} | {cond_s} | {verdict}")
             if not items: return tr("no_exit_path")
             if len(items) > max_list:
@@ -2668,25 +3795,25 @@ class ChapterEditor(tk.Tk):
             for i, comp in enumerate(definite, 1):
                 lines.append(tr("loop_nodes_line", i=i, count=len(comp)))
                 lines.append(tr("loop_path_summary_line", path=nodes_summary(comp)))
-                lines.append(tr("loop_no_exit"))
-                lines.append(tr("loop_definite_action"))
+                lines.append(T_NO_EXIT)
+                lines.append(T_DEFINITE_ACTION)
                 lines.append("")
         if witnessed:
             lines.append(tr("loop_witnessed_header"))
             for i, (comp, path) in enumerate(witnessed, 1):
                 lines.append(tr("loop_nodes_line", i=i, count=len(comp)))
                 lines.append(tr("loop_path_summary_line", path=nodes_summary(comp)))
-                lines.append(tr("loop_example_path"))
+                lines.append(T_EXAMPLE_PATH)
                 for step in path[:12]:
                     src_bid, text, tgt_bid = step
                     lines.append(f"     {src_bid} --[{text}]--> {tgt_bid}")
                 if len(path) > 12:
                     lines.append(tr("loop_more_steps", count=len(path) - 12))
                 ex = exit_edges_summary(comp, max_list=2)
-                lines.append(tr("loop_exit_candidates"))
+                lines.append(T_EXIT_CANDIDATES)
                 for ln in ex.split("\n"):
                     lines.append("     " + ln)
-                lines.append(tr("loop_witnessed_action"))
+                lines.append(T_WITNESSED_ACTION)
                 lines.append("")
         if possible:
             lines.append(tr("loop_possible_header"))
@@ -2694,10 +3821,10 @@ class ChapterEditor(tk.Tk):
                 lines.append(tr("loop_nodes_line", i=i, count=len(comp)))
                 lines.append(tr("loop_path_summary_line", path=nodes_summary(comp)))
                 ex = exit_edges_summary(comp, max_list=3)
-                lines.append(tr("loop_exit_summary"))
+                lines.append(T_EXIT_SUMMARY)
                 for ln in ex.split("\n"):
                     lines.append("     " + ln)
-                lines.append(tr("loop_possible_action"))
+                lines.append(T_POSSIBLE_ACTION)
                 lines.append("")
 
         lines.append(tr("definitions_heading"))
@@ -2709,38 +3836,46 @@ class ChapterEditor(tk.Tk):
         return lines, definite, witnessed, possible
 
     def _show_validation_results(self, title: str, lines: List[str]) -> None:
-        win = tk.Toplevel(self)
-        win.title(title)
-        win.geometry("720x480")
-        frm = ttk.Frame(win, padding=8)
-        frm.pack(fill="both", expand=True)
-
-        txt = tk.Text(frm, wrap="word", font=("Consolas", 10))
-        txt.pack(side="left", fill="both", expand=True)
-        scr = ttk.Scrollbar(frm, orient="vertical", command=txt.yview)
-        scr.pack(side="right", fill="y")
-        txt.configure(yscrollcommand=scr.set)
-        txt.insert(tk.END, "\n".join(lines))
-        txt.configure(state="disabled")
-
-        ttk.Button(win, text=tr("close"), command=win.destroy).pack(pady=6)
+        self._val_win = self._show_report_window(self._val_win, title, "720x480", lines)
 
     def _show_loop_analysis(self, lines: List[str]) -> None:
-        win = tk.Toplevel(self)
-        win.title(tr("loop_analysis_title"))
-        win.geometry("900x560")
-        frm = ttk.Frame(win, padding=8)
-        frm.pack(fill="both", expand=True)
-
-        txt = tk.Text(frm, wrap="word", font=("Consolas", 10))
-        txt.pack(side="left", fill="both", expand=True)
-        scr = ttk.Scrollbar(frm, orient="vertical", command=txt.yview)
-        scr.pack(side="right", fill="y")
-        txt.configure(yscrollcommand=scr.set)
+        self._loop_win = self._show_report_window(
+            self._loop_win, tr("loop_analysis_title"), "900x560", lines
+        )
+
+    def _show_report_window(
+        self,
+        cached: Optional[Tuple[tk.Toplevel, tk.Text]],
+        title: str,
+        geometry: str,
+        lines: List[str],
+    ) -> Tuple[tk.Toplevel, tk.Text]:
+        """Fill a read-only report window, reusing ``cached`` while it still exists."""
+        if cached is not None and cached[0].winfo_exists():
+            win, txt = cached
+            txt.configure(state="normal")
+            txt.delete("1.0", tk.END)
+        else:
+            win = tk.Toplevel(self)
+            win.geometry(geometry)
+            # 닫기는 창을 숨기기만 해서 다음 검사 때 위젯을 새로 만들지 않는다.
+            win.protocol("WM_DELETE_WINDOW", win.withdraw)
+            frm = ttk.Frame(win, padding=8)
+            frm.pack(fill="both", expand=True)
+
+            txt = tk.Text(frm, wrap="word", font=("Consolas", 10))
+            txt.pack(side="left", fill="both", expand=True)
+            scr = ttk.Scrollbar(frm, orient="vertical", command=txt.yview)
+            scr.pack(side="right", fill="y")
+            txt.configure(yscrollcommand=scr.set)
+
+            ttk.Button(win, text=tr("close"), command=win.withdraw).pack(pady=6)
+        win.title(title)
         txt.insert(tk.END, "\n".join(lines))
         txt.configure(state="disabled")
-
-        ttk.Button(win, text=tr("close"), command=win.destroy).pack(pady=6)
+        win.deiconify()
+        win.lift()
+        return win, txt
 
 
 # ---------- 진입점 ----------
@@ -0,0 +1,25 @@
+"""
+Optional Cython build for the editor's parsing helpers.
+
+The editor runs fine without it; compiling only speeds up the scanning and
+parsing code in ``_fastparse.py``::
+
+  pip install cython
+  python setup.py build_ext --inplace
+"""
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+
+setup(
+    name="branching-novel-tools-speedups",
+    ext_modules=cythonize(
+        "_fastparse.py",
+        compiler_directives={
+            "language_level": "3",
+            "boundscheck": False,
+            "wraparound": False,
+        },
+    ),
+)
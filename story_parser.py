@@ -1,8 +1,22 @@
 import re
 import ast
-from dataclasses import dataclass, field
+import pickle
+from dataclasses import dataclass, field, replace
 from typing import List, Dict, Optional, Union, Tuple
 
+# 액션 연산 이름과 대입 기호의 대응 ('expr'은 '='로 쓰지만 기호로 되돌리면 'set'이 된다)
+ACTION_OP_SYMBOLS: Dict[str, str] = {
+    "set": "=",
+    "add": "+=",
+    "sub": "-=",
+    "mul": "*=",
+    "div": "/=",
+    "floordiv": "//=",
+    "mod": "%=",
+    "pow": "**=",
+}
+ACTION_SYMBOL_OPS: Dict[str, str] = {sym: op for op, sym in ACTION_OP_SYMBOLS.items()}
+
 @dataclass
 class Action:
     op: str  # e.g. 'set', 'add', 'sub', 'mul', 'div', 'floordiv', 'mod', 'pow', 'expr'
@@ -50,6 +64,175 @@ class Story:
     chapters: Dict[str, Chapter] = field(default_factory=dict)
     branches: Dict[str, Branch] = field(default_factory=dict)
     variables: Dict[str, Union[int, float, bool, str]] = field(default_factory=dict)
+    # 분기별 직렬화 결과 캐시: bid -> (branch 객체, 줄 목록)
+    _serialized_cache: Dict[str, Tuple[Branch, List[str]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # 분기별 스냅샷 피클 캐시: bid -> (branch 객체, chapter_id, (bid, 피클 bytes))
+    _snapshot_cache: Dict[str, Tuple[Branch, str, Tuple[str, bytes]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # 직전 스냅샷의 (챕터 튜플, 분기 튜플): 내용이 같으면 다음 스냅샷이 그대로 공유한다.
+    _snapshot_parts: Optional[Tuple[tuple, tuple]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # 역방향 선택지 색인: target_id -> [(선택지를 가진 branch, choice)], 처음 조회할 때 만든다.
+    _incoming: Optional[Dict[str, List[Tuple[Branch, Choice]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def mark_dirty(self, *bids: str) -> None:
+        """Drop cached serialization for branches whose content changed."""
+        for bid in bids:
+            self._serialized_cache.pop(bid, None)
+            self._snapshot_cache.pop(bid, None)
+
+    def __getstate__(self):
+        # 복사/스냅샷에는 캐시를 싣지 않는다.
+        state = self.__dict__.copy()
+        state["_serialized_cache"] = {}
+        state["_snapshot_cache"] = {}
+        state["_snapshot_parts"] = None
+        state["_incoming"] = None
+        return state
+
+    def snapshot(self) -> tuple:
+        """Return an immutable snapshot of the story for undo.
+
+        Each branch is pickled on its own and the bytes are cached until
+        ``mark_dirty`` drops them, so consecutive snapshots re-pickle only
+        the branches that changed and share the bytes of all the others.
+        The chapter and branch tuples are also taken over from the previous
+        snapshot when they did not change, so an undo step that only touched
+        the story metadata adds a few small objects instead of one entry per
+        branch. Rebuild the story with ``Story.from_snapshot``.
+        """
+        cache = self._snapshot_cache
+        blobs = []
+        for bid, br in self.branches.items():
+            cached = cache.get(bid)
+            # 챕터 이동/이름 변경은 직렬화에 드러나지 않아 mark_dirty 없이 일어날 수 있다.
+            if cached is None or cached[0] is not br or cached[1] != br.chapter_id:
+                cached = (br, br.chapter_id, (bid, pickle.dumps(br, pickle.HIGHEST_PROTOCOL)))
+                cache[bid] = cached
+            blobs.append(cached[2])
+        chapters = tuple(
+            (cid, ch.chapter_id, ch.title, ch.line, ch.source, tuple(ch.branches))
+            for cid, ch in self.chapters.items()
+        )
+        blobs_t = tuple(blobs)
+        prev = self._snapshot_parts
+        if prev is not None:
+            # 분기 항목은 캐시의 같은 객체라 비교가 동일성 검사로 끝난다.
+            if chapters == prev[0]:
+                chapters = prev[0]
+            if blobs_t == prev[1]:
+                blobs_t = prev[1]
+        self._snapshot_parts = (chapters, blobs_t)
+        return (
+            self.title,
+            self.start_id,
+            self.ending_text,
+            self.show_disabled,
+            tuple(self.variables.items()),
+            chapters,
+            blobs_t,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snap: tuple) -> "Story":
+        """Rebuild a story from ``snapshot()``; every object in it is new."""
+        title, start_id, ending_text, show_disabled, variables, chapters, blobs = snap
+        story = cls(
+            title=title,
+            start_id=start_id,
+            ending_text=ending_text,
+            show_disabled=show_disabled,
+            variables=dict(variables),
+        )
+        for item in blobs:
+            bid, blob = item
+            br = pickle.loads(blob)
+            story.branches[bid] = br
+            # 복원한 분기는 같은 bytes에서 나왔으므로 다음 스냅샷에서 다시 피클하지 않는다.
+            story._snapshot_cache[bid] = (br, br.chapter_id, item)
+        for cid, chapter_id, ch_title, line, source, bids in chapters:
+            story.chapters[cid] = Chapter(
+                chapter_id=chapter_id,
+                title=ch_title,
+                branches={bid: story.branches[bid] for bid in bids},
+                line=line,
+                source=source,
+            )
+        story._snapshot_parts = (chapters, blobs)
+        return story
+
+    def clone(self) -> "Story":
+        """Copy the story without ``copy.deepcopy``.
+
+        Containers the editor mutates in place (chapter/branch dicts, choice
+        and action lists, variables) and ``Choice`` objects are copied;
+        strings and ``Action`` objects are shared.
+        """
+        copies: Dict[int, Branch] = {}
+
+        def _branch(br: Branch) -> Branch:
+            dup = copies.get(id(br))
+            if dup is None:
+                dup = replace(
+                    br,
+                    paragraphs=list(br.paragraphs),
+                    choices=[replace(c, actions=list(c.actions)) for c in br.choices],
+                    actions=list(br.actions),
+                )
+                copies[id(br)] = dup
+            return dup
+
+        branches = {bid: _branch(br) for bid, br in self.branches.items()}
+        chapters = {
+            cid: replace(ch, branches={bid: _branch(br) for bid, br in ch.branches.items()})
+            for cid, ch in self.chapters.items()
+        }
+        return replace(self, chapters=chapters, branches=branches, variables=dict(self.variables))
+
+    def incoming(self, target_id: str) -> List[Tuple[Branch, Choice]]:
+        """Return ``(branch, choice)`` pairs whose choice points at ``target_id``."""
+        if self._incoming is None:
+            index: Dict[str, List[Tuple[Branch, Choice]]] = {}
+            for br in self.branches.values():
+                for c in br.choices:
+                    index.setdefault(c.target_id, []).append((br, c))
+            self._incoming = index
+        return self._incoming.get(target_id, [])
+
+    def link_choice(self, br: Branch, choice: Choice) -> None:
+        if self._incoming is not None:
+            self._incoming.setdefault(choice.target_id, []).append((br, choice))
+
+    def unlink_choice(self, choice: Choice) -> None:
+        if self._incoming is None:
+            return
+        entries = self._incoming.get(choice.target_id)
+        if not entries:
+            return
+        for i, (_, c) in enumerate(entries):
+            if c is choice:
+                del entries[i]
+                break
+        if not entries:
+            del self._incoming[choice.target_id]
+
+    def retarget_choices(self, old_id: str, new_id: str) -> List[Tuple[Branch, Choice]]:
+        """Point every choice aimed at ``old_id`` to ``new_id`` and return them."""
+        moved = self.incoming(old_id)
+        if not moved:
+            return []
+        del self._incoming[old_id]
+        for br, c in moved:
+            c.target_id = new_id
+            self.mark_dirty(br.branch_id)
+        self._incoming.setdefault(new_id, []).extend(moved)
+        return moved
 
     def get_chapter(self, cid: str) -> Optional[Chapter]:
         return self.chapters.get(cid)
@@ -104,75 +287,86 @@ class Story:
             chap_header = f"@chapter {ch.chapter_id}: {ch.title}" if ch.title else f"@chapter {ch.chapter_id}"
             lines.append(chap_header)
             for bid, br in ch.branches.items():
-                br_header = f"# {br.branch_id}: {br.title}" if br.title else f"# {br.branch_id}"
-                lines.append(br_header)
-                if br.raw_text:
-                    for ln in br.raw_text.rstrip().splitlines():
-                        lines.append(ln.rstrip())
-                    lines.append("")
+                cached = self._serialized_cache.get(bid)
+                if cached is None or cached[0] is not br:
+                    cached = (br, self._serialize_branch(br))
+                    self._serialized_cache[bid] = cached
+                lines.extend(cached[1])
+        while lines and lines[-1] == "":
+            lines.pop()
+        return "\n".join(lines)
+
+    @staticmethod
+    def _serialize_branch(br: Branch) -> List[str]:
+        lines: List[str] = []
+        br_header = f"# {br.branch_id}: {br.title}" if br.title else f"# {br.branch_id}"
+        lines.append(br_header)
+        if br.raw_text:
+            for ln in br.raw_text.rstrip().splitlines():
+                lines.append(ln.rstrip())
+            lines.append("")
+        else:
+            for p in br.paragraphs:
+                lines.append(p.rstrip())
+                lines.append("")
+        for act in br.actions:
+            if act.op == "expr":
+                lines.append(f"! {act.var} = {act.value}")
+            else:
+                if isinstance(act.value, bool):
+                    v = str(act.value).lower()
+                elif isinstance(act.value, str):
+                    v = repr(act.value)
+                else:
+                    v = act.value
+                if act.op == "set":
+                    lines.append(f"! {act.var} = {v}")
                 else:
-                    for p in br.paragraphs:
-                        lines.append(p.rstrip())
-                        lines.append("")
-                op_map = {
-                    "add": "+=",
-                    "sub": "-=",
-                    "mul": "*=",
-                    "div": "/=",
-                    "floordiv": "//=",
-                    "mod": "%=",
-                    "pow": "**=",
-                }
-                for act in br.actions:
+                    sym = ACTION_OP_SYMBOLS.get(act.op)
+                    if sym:
+                        lines.append(f"! {act.var} {sym} {v}")
+        for c in br.choices:
+            cond_part = f"[{c.condition}] " if c.condition else ""
+            act_part = ""
+            if c.actions:
+                acts: List[str] = []
+                for act in c.actions:
                     if act.op == "expr":
-                        lines.append(f"! {act.var} = {act.value}")
+                        acts.append(f"{act.var} = {act.value}")
                     else:
-                        if isinstance(act.value, bool):
-                            v = str(act.value).lower()
-                        elif isinstance(act.value, str):
-                            v = repr(act.value)
+                        val = act.value
+                        if isinstance(val, bool):
+                            v = str(val).lower()
+                        elif isinstance(val, str):
+                            v = repr(val)
                         else:
-                            v = act.value
+                            v = val
                         if act.op == "set":
-                            lines.append(f"! {act.var} = {v}")
+                            acts.append(f"{act.var} = {v}")
                         else:
-                            sym = op_map.get(act.op)
+                            sym = ACTION_OP_SYMBOLS.get(act.op)
                             if sym:
-                                lines.append(f"! {act.var} {sym} {v}")
-                for c in br.choices:
-                    cond_part = f"[{c.condition}] " if c.condition else ""
-                    act_part = ""
-                    if c.actions:
-                        acts: List[str] = []
-                        for act in c.actions:
-                            if act.op == "expr":
-                                acts.append(f"{act.var} = {act.value}")
-                            else:
-                                val = act.value
-                                if isinstance(val, bool):
-                                    v = str(val).lower()
-                                elif isinstance(val, str):
-                                    v = repr(val)
-                                else:
-                                    v = val
-                                if act.op == "set":
-                                    acts.append(f"{act.var} = {v}")
-                                else:
-                                    sym = op_map.get(act.op)
-                                    if sym:
-                                        acts.append(f"{act.var} {sym} {v}")
-                        act_part = "{" + "; ".join(acts) + "} "
-                    lines.append(f"* {cond_part}{act_part}{c.text} -> {c.target_id}")
-                lines.append("")
-        while lines and lines[-1] == "":
-            lines.pop()
-        return "\n".join(lines)
+                                acts.append(f"{act.var} {sym} {v}")
+                act_part = "{" + "; ".join(acts) + "} "
+            lines.append(f"* {cond_part}{act_part}{c.text} -> {c.target_id}")
+        lines.append("")
+        return lines
 
 class ParseError(Exception):
     pass
 
+_COMMENT_GUARD_CHARS = frozenset("\"'{")
+
+
 class StoryParser:
     def _strip_inline_comment(self, line: str) -> str:
+        idx = line.find(";")
+        if idx == -1:
+            return line.rstrip()
+        # 첫 ';' 앞에 따옴표나 '{'가 없으면 그 ';'가 바로 주석 시작이다.
+        # 대부분의 줄은 여기서 끝나 글자 단위 순회를 하지 않는다.
+        if _COMMENT_GUARD_CHARS.isdisjoint(line[:idx]):
+            return line[:idx].rstrip()
         in_brace = 0
         in_quote: Optional[str] = None
         for i, ch in enumerate(line):
@@ -194,23 +388,21 @@ class StoryParser:
 
     def _remove_comments(self, lines: List[str]) -> List[str]:
         result: List[str] = []
-        i = 0
         in_block = False
-        while i < len(lines):
-            line = lines[i]
+        strip_inline = self._strip_inline_comment
+        for line in lines:
+            if ";" not in line:
+                # 주석 기호가 없는 줄은 블록 주석 안인지만 보면 된다.
+                if not in_block:
+                    result.append(line.rstrip())
+                continue
             stripped = line.strip()
             if stripped == ';':
                 in_block = not in_block
-                i += 1
-                continue
-            if in_block:
-                i += 1
                 continue
-            if stripped.startswith(';'):
-                i += 1
+            if in_block or stripped.startswith(';'):
                 continue
-            result.append(self._strip_inline_comment(line))
-            i += 1
+            result.append(strip_inline(line))
         return result
 
     def parse(self, text: str) -> Story:
@@ -432,16 +624,6 @@ class StoryParser:
                 raise ParseError("Invalid action syntax in choice.")
             var, op, val = m.groups()
             var = self._ensure_valid_var(var)
-            op_map = {
-                "=": "set",
-                "+=": "add",
-                "-=": "sub",
-                "*=": "mul",
-                "/=": "div",
-                "//=": "floordiv",
-                "%=": "mod",
-                "**=": "pow",
-            }
             if op == "=":
                 try:
                     parsed = self._parse_value(val.strip())
@@ -449,7 +631,7 @@ class StoryParser:
                 except ParseError:
                     actions.append(Action(op="expr", var=var, value=val.strip(), line=line_no, source=source))
             else:
-                actions.append(Action(op=op_map[op], var=var, value=self._parse_value(val.strip()), line=line_no, source=source))
+                actions.append(Action(op=ACTION_SYMBOL_OPS[op], var=var, value=self._parse_value(val.strip()), line=line_no, source=source))
         return actions
 
     def _parse_action_line(self, line: str, line_no: int, source: str) -> Action:
@@ -472,23 +654,13 @@ class StoryParser:
         if m:
             var, op, val = m.groups()
             var = self._ensure_valid_var(var)
-            op_map = {
-                "=": "set",
-                "+=": "add",
-                "-=": "sub",
-                "*=": "mul",
-                "/=": "div",
-                "//=": "floordiv",
-                "%=": "mod",
-                "**=": "pow",
-            }
             if op == "=":
                 try:
                     parsed = self._parse_value(val.strip())
                     return Action(op="set", var=var, value=parsed, line=line_no, source=source)
                 except ParseError:
                     return Action(op="expr", var=var, value=val.strip(), line=line_no, source=source)
-            return Action(op=op_map[op], var=var, value=self._parse_value(val.strip()), line=line_no, source=source)
+            return Action(op=ACTION_SYMBOL_OPS[op], var=var, value=self._parse_value(val.strip()), line=line_no, source=source)
         raise ParseError("Unknown action command.")
 
     def _ensure_valid_var(self, name: str) -> str:
@@ -0,0 +1,75 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from _fastparse import (
+    block_comment_open,
+    coerce_value,
+    comment_spans,
+    find_in_texts,
+    parse_action_rows,
+    split_paragraphs,
+    variable_spans,
+)
+
+
+def test_coerce_value_types():
+    assert coerce_value("TRUE") is True
+    assert coerce_value("false") is False
+    assert coerce_value("'hi'") == "hi"
+    assert coerce_value("3") == 3
+    assert coerce_value("2.5") == 2.5
+    assert coerce_value("plain") == "plain"
+
+
+def test_parse_action_rows():
+    rows = parse_action_rows("gold += 5; name = 'x' ;")
+    assert rows == [("gold", "+=", "5"), ("name", "=", "'x'")]
+
+
+def test_variable_spans_undefined_name_leaves_closing_underscores():
+    text = "__a__b__ __c__"
+    assert variable_spans(text, {"b"}) == [(3, 8)]
+    assert variable_spans(text, {"a", "c"}) == [(0, 5), (9, 14)]
+
+
+def test_variable_spans_defined_token_consumes_closing_underscores():
+    assert variable_spans("__a__b__ ___a__", {"a", "b"}) == [(0, 5), (10, 15)]
+
+
+def test_variable_spans_matches_whole_names_only():
+    names = frozenset({"hp", "hp_max"} | {f"v{i}" for i in range(1000)})
+    assert variable_spans("__hp__ __hp_max__", names) == [(0, 6), (7, 17)]
+    assert variable_spans("__hp__ __hp_max__", {"hp"}) == [(0, 6)]
+
+
+def test_coerce_value_non_numeric_prefix_stays_string():
+    assert coerce_value("inf") == "inf"
+    assert coerce_value("-7") == -7
+    assert coerce_value(".5") == 0.5
+    assert coerce_value("1abc") == "1abc"
+
+
+def test_split_paragraphs_matches_split_and_strip():
+    text = "\n first \n\n\n\nsecond\nline\n\n   \n\nthird"
+    expected = [p.strip() for p in text.split("\n\n") if p.strip()]
+    assert split_paragraphs(text) == expected == ["first", "second\nline", "third"]
+    assert split_paragraphs("") == []
+
+
+def test_comment_spans_resume_inside_block():
+    head = "text\n;\ninside\n"
+    tail = "still\n;\nafter ; note\n"
+    assert block_comment_open(head)
+    full = comment_spans(head + tail)
+    shifted = [(s + len(head), e + len(head)) for s, e in comment_spans(tail, True)]
+    assert [sp for sp in full if sp[0] >= len(head)] == shifted
+
+
+def test_find_in_texts_keeps_matches_inside_each_text():
+    texts = ["aXa", "", "Xa aX", "a"]
+    assert find_in_texts(texts, "aX") == [[0], [], [3], []]
+    # 텍스트 경계를 넘는 일치는 없어야 한다.
+    assert find_in_texts(["ab", "cd"], "bc") == [[], []]
+    assert find_in_texts(["a\0b", "b"], "\0b") == [[1], []]
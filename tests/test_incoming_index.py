@@ -0,0 +1,45 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from story_parser import Choice, Story, StoryParser
+
+
+TEXT = (
+    "@chapter c1\n"
+    "# a\n"
+    "* to b -> b\n"
+    "* loop -> a\n"
+    "# b\n"
+    "* back -> a\n"
+)
+
+
+def test_retarget_choices_updates_targets_and_index():
+    story = StoryParser().parse(TEXT)
+    assert {c.text for _, c in story.incoming('a')} == {'loop', 'back'}
+
+    extra = Choice(text='again', target_id='a')
+    story.branches['b'].choices.append(extra)
+    story.link_choice(story.branches['b'], extra)
+
+    moved = story.retarget_choices('a', 'start')
+    assert {c.text for _, c in moved} == {'loop', 'back', 'again'}
+    assert story.incoming('a') == []
+    assert all(c.target_id == 'start' for _, c in story.incoming('start'))
+    assert '-> start' in story.serialize()
+
+    story.unlink_choice(extra)
+    assert {c.text for _, c in story.incoming('start')} == {'loop', 'back'}
+
+
+def test_restored_snapshot_builds_its_own_index():
+    story = StoryParser().parse(TEXT)
+    story.incoming('a')
+    restored = Story.from_snapshot(story.snapshot())
+    restored.retarget_choices('a', 'start')
+    assert {c.text for _, c in restored.incoming('start')} == {'loop', 'back'}
+    # 원래 스토리의 선택지와 색인은 그대로여야 한다.
+    assert {c.text for _, c in story.incoming('a')} == {'loop', 'back'}
+    assert story.branches['b'].choices[0].target_id == 'a'
@@ -0,0 +1,40 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from branching_novel_editor import ChapterEditor
+from story_parser import StoryParser
+
+
+def _analyze(text: str):
+    editor = ChapterEditor.__new__(ChapterEditor)
+    editor.story = StoryParser().parse(text)
+    return editor._analyze_infinite_loops(show_window=False)
+
+
+def test_counter_loop_with_exit_is_not_definite():
+    _, definite, witnessed, possible = _analyze(
+        "@start: a\n"
+        "! n = 0\n"
+        "@chapter c1\n"
+        "# a\n"
+        "! n += 1\n"
+        "* [n < 10] again -> a\n"
+        "* [n >= 10] done -> b\n"
+        "# b\n"
+    )
+    assert definite == [] and witnessed == []
+    assert possible == [['a']]
+
+
+def test_string_variables_do_not_break_analysis():
+    _, definite, _, _ = _analyze(
+        "@start: a\n"
+        "! name = 'hero'\n"
+        "@chapter c1\n"
+        "# a\n"
+        "! name = 'villain'\n"
+        "* stay -> a\n"
+    )
+    assert definite == [['a']]
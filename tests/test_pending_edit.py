@@ -0,0 +1,119 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import branching_novel_editor
+from branching_novel_editor import ChapterEditor
+from story_parser import StoryParser
+
+
+class _Field:
+    """Just enough of a Tk Entry/Text for loading and reading the form."""
+
+    def __init__(self):
+        self.text = ""
+
+    def get(self, *args):
+        return self.text
+
+    def delete(self, *args):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+
+    def config(self, **kwargs):
+        pass
+
+    def edit_modified(self, *args):
+        return False
+
+
+class _Undo:
+    def __init__(self, editor):
+        self.editor = editor
+        self.states = []
+
+    @property
+    def records(self):
+        return len(self.states)
+
+    def record(self):
+        story = self.editor.story
+        self.states.append({bid: list(br.paragraphs) for bid, br in story.branches.items()})
+
+
+class _Editor(ChapterEditor):
+    def __init__(self, story):
+        self.story = story
+        self.current_chapter_id = None
+        self.current_branch_id = None
+        self._edit_commit_job = None
+        self._body_branch = None
+        self._body_applied = None
+        self.undo_manager = _Undo(self)
+        self.ent_br_id = _Field()
+        self.ent_br_title = _Field()
+        self.txt_body = _Field()
+        self.tree_choices = None
+        self._find_text_cache = {}
+        self._find_hits = {}
+
+    def after(self, ms, func=None, *args):
+        return "after#1"
+
+    def after_cancel(self, job):
+        pass
+
+    def _schedule_form_highlight(self):
+        pass
+
+    def _schedule_meta_refresh(self):
+        pass
+
+    def _schedule_code_update(self):
+        pass
+
+    def _refresh_branch_list(self):
+        pass
+
+    def _set_dirty(self, val):
+        pass
+
+    @staticmethod
+    def _sync_tree_rows(tree, rows):
+        pass
+
+
+def test_switching_branch_keeps_pending_body_edit():
+    story = StoryParser().parse("@chapter c1\n# a\nHello\n\n# b\nWorld\n")
+    editor = _Editor(story)
+    editor.current_chapter_id = "c1"
+    editor._load_branch_to_form("a")
+    editor.txt_body.text = "Typed"
+    editor._schedule_edit_commit()
+
+    # 입력이 멈추기 전에 다른 분기로 옮겨도 입력한 본문이 남아야 한다.
+    editor._load_branch_to_form("b")
+    assert story.branches["a"].paragraphs == ["Typed"]
+    assert story.branches["b"].paragraphs == ["World"]
+    assert editor._edit_commit_job is None
+    assert editor.undo_manager.records == 1
+
+
+def test_deleting_branch_keeps_pending_edit_in_undo_history(monkeypatch):
+    monkeypatch.setattr(branching_novel_editor.messagebox, "askyesno", lambda *a, **k: True)
+    story = StoryParser().parse("@chapter c1\n# a\nHello\n\n# b\nWorld\n")
+    editor = _Editor(story)
+    editor.current_chapter_id = "c1"
+    editor._rebuild_branch_index()
+    editor._load_branch_to_form("a")
+    editor.txt_body.text = "Typed"
+    editor._schedule_edit_commit()
+
+    editor._delete_current_branch()
+    # 삭제 직전 상태에 입력한 본문이 남아 있어 한 번의 undo로 되돌릴 수 있어야 한다.
+    before, after = editor.undo_manager.states
+    assert before["a"] == ["Typed"]
+    assert "a" not in after
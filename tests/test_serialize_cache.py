@@ -0,0 +1,83 @@
+import copy
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from story_parser import Story, StoryParser
+
+
+TEXT = (
+    "@start: b1\n"
+    "@chapter c1: Chapter\n"
+    "# b1: One\n"
+    "first\n"
+    "* go -> b2\n"
+    "\n"
+    "# b2: Two\n"
+    "second\n"
+)
+
+
+def test_mark_dirty_refreshes_only_changed_branch():
+    story = StoryParser().parse(TEXT)
+    before = story.serialize()
+    story.branches['b1'].paragraphs = ['changed']
+    # Without invalidation the cached block is reused.
+    assert story.serialize() == before
+    story.mark_dirty('b1')
+    after = story.serialize()
+    assert 'changed' in after and 'first' not in after
+    assert StoryParser().parse(TEXT).serialize() != after
+
+
+def test_copies_do_not_share_cache():
+    story = StoryParser().parse(TEXT)
+    story.serialize()
+    clone = copy.deepcopy(story)
+    clone.branches['b2'].paragraphs = ['other']
+    assert 'other' in clone.serialize()
+    assert 'other' not in story.serialize()
+
+
+def test_clone_is_independent():
+    story = StoryParser().parse(TEXT)
+    clone = story.clone()
+    assert clone == story
+    assert clone.chapters['c1'].branches['b1'] is clone.branches['b1']
+    clone.branches['b1'].choices[0].target_id = 'b1'
+    clone.chapters['c1'].branches.pop('b2')
+    assert story.branches['b1'].choices[0].target_id == 'b2'
+    assert 'b2' in story.chapters['c1'].branches
+
+
+def test_snapshot_repickles_only_dirty_branches():
+    story = StoryParser().parse(TEXT)
+    first = story.snapshot()
+    story.branches['b1'].paragraphs = ['changed']
+    story.mark_dirty('b1')
+    second = story.snapshot()
+    blobs1, blobs2 = dict(first[-1]), dict(second[-1])
+    assert blobs2['b2'] is blobs1['b2']
+    assert blobs2['b1'] is not blobs1['b1']
+    restored = Story.from_snapshot(second)
+    assert restored == story
+    assert restored.chapters['c1'].branches['b1'] is restored.branches['b1']
+    assert Story.from_snapshot(first).branches['b1'].paragraphs == ['first']
+
+
+def test_snapshot_shares_unchanged_parts_with_previous():
+    story = StoryParser().parse(TEXT)
+    first = story.snapshot()
+    story.title = 'Renamed'
+    second = story.snapshot()
+    assert second[0] == 'Renamed'
+    assert second[-1] is first[-1]
+    assert second[-2] is first[-2]
+    story.branches['b1'].paragraphs = ['changed']
+    story.mark_dirty('b1')
+    third = story.snapshot()
+    assert third[-1] is not second[-1]
+    assert third[-1][1] is second[-1][1]
+    restored = Story.from_snapshot(third)
+    assert restored.snapshot()[-1] is third[-1]
@@ -0,0 +1,26 @@
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from branching_novel_editor import UndoManager
+from story_parser import StoryParser
+
+
+def test_undo_restores_snapshot_with_shared_branches():
+    holder = {"story": StoryParser().parse("@chapter c1\n# a\nHello\n* Go -> a\n")}
+    manager = UndoManager(
+        lambda: {"story": holder["story"]},
+        lambda state: holder.update(story=state["story"]),
+    )
+    holder["story"].branches["a"].paragraphs.append("More")
+    manager.record()
+
+    manager.undo()
+    restored = holder["story"]
+    assert restored.branches["a"].paragraphs == ["Hello"]
+    # 챕터와 스토리가 같은 분기 객체를 가리키는 구조가 유지되어야 한다.
+    assert restored.chapters["c1"].branches["a"] is restored.branches["a"]
+
+    manager.redo()
+    assert holder["story"].branches["a"].paragraphs == ["Hello", "More"]
@@ -0,0 +1,56 @@
+import os
+import pathlib
+import stat
+import sys
+
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from branching_novel_editor import write_story_file, write_text_atomic
+
+
+def test_write_story_file_replaces_content(tmp_path):
+    path = tmp_path / "story.bnov"
+    path.write_text("old\n", encoding="utf-8")
+    write_story_file(str(path), "@title: 새 이야기")
+    assert path.read_text(encoding="utf-8") == "@title: 새 이야기\n"
+    assert os.listdir(tmp_path) == ["story.bnov"]
+
+
+def test_write_text_atomic_writes_text_as_is(tmp_path):
+    path = tmp_path / "editor_language.txt"
+    write_text_atomic(str(path), "ko")
+    assert path.read_text(encoding="utf-8") == "ko"
+    assert os.listdir(tmp_path) == ["editor_language.txt"]
+
+
+def test_write_story_file_keeps_original_on_failure(tmp_path):
+    path = tmp_path / "story.bnov"
+    path.write_text("old\n", encoding="utf-8")
+    with pytest.raises(UnicodeEncodeError):
+        write_story_file(str(path), "bad \ud800")
+    assert path.read_text(encoding="utf-8") == "old\n"
+    assert os.listdir(tmp_path) == ["story.bnov"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX symlinks and mode bits")
+def test_write_story_file_keeps_symlink_and_mode(tmp_path):
+    real = tmp_path / "real.bnov"
+    real.write_text("old\n", encoding="utf-8")
+    real.chmod(0o640)
+    link = tmp_path / "link.bnov"
+    link.symlink_to(real)
+    write_story_file(str(link), "new")
+    assert link.is_symlink()
+    assert real.read_text(encoding="utf-8") == "new\n"
+    assert stat.S_IMODE(real.stat().st_mode) == 0o640
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX mode bits")
+def test_write_story_file_new_file_gets_default_mode(tmp_path):
+    reference = tmp_path / "reference.txt"
+    reference.write_text("", encoding="utf-8")
+    path = tmp_path / "new.bnov"
+    write_story_file(str(path), "new")
+    assert stat.S_IMODE(path.stat().st_mode) == stat.S_IMODE(reference.stat().st_mode)